@@ -0,0 +1,226 @@
+"""Benchmarks for clv_cache.db access paths.
+
+Runs against a throwaway database in a temp directory, e.g.:
+
+    python bench_cache_db.py queries --jobs 20000 --leagues 5000
+    python bench_cache_db.py league-format --matches 380 --lookups 10
+    python bench_cache_db.py ingest --bets 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import cache_database
+from cache_database import CacheDatabase
+from database import Database
+
+SPORTS = ["football", "basketball", "tennis", "ice hockey"]
+LEAGUES = [f"league-{i}" for i in range(40)]
+STATUSES = ["completed"] * 8 + ["failed", "queued"]
+BOOKMAKERS = ["pinnacle", "bet365", "betfair", "williamhill", "unibet", "10bet", "coral", "ladbrokes"]
+MARKETS = ["1X2", "Over/Under 2.5", "Both Teams to Score", "Asian Handicap -0.5"]
+
+
+def timed(func, repeat: int) -> float:
+    """Median wall time of func() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def seed(db: Database, jobs: int, leagues: int):
+    conn = db._get_connection()
+    conn.execute("PRAGMA synchronous=OFF")
+    for _ in range(jobs):
+        job_id = str(uuid.uuid4())
+        db.create_job(job_id, 1)
+        db.update_job_status(job_id, random.choice(STATUSES))
+    for i in range(leagues):
+        db.cache_league_data(
+            random.choice(SPORTS),
+            random.choice(LEAGUES),
+            f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            {"matches": [], "source": "bench"},
+        )
+
+
+def query_suite(db: Database) -> dict:
+    conn = db._get_connection()
+    return {
+        "get_jobs_by_status(queued)": lambda: db.get_jobs_by_status("queued"),
+        "failure rate (24h)": lambda: (
+            conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'failed' "
+                "AND created_at > datetime('now', '-24 hours')"
+            ).fetchone(),
+            conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE created_at > datetime('now', '-24 hours')"
+            ).fetchone(),
+        ),
+        "get_cached_league_data": lambda: db.get_cached_league_data(
+            random.choice(SPORTS), random.choice(LEAGUES), "2025-06-15"
+        ),
+    }
+
+
+def season_data(matches: int) -> dict:
+    """A scrape result shaped like transform_oddsharvester_match() output."""
+    # Double round robin: every ordered pair of teams plays once
+    n = max(2, int(matches ** 0.5) + 2)
+    teams = [f"Team {chr(65 + i % 26)}{i} FC" for i in range(n)]
+    return {
+        "source": "bench",
+        "matches": [
+            {
+                "home_team": teams[i % n],
+                "away_team": teams[(i % n + 1 + i // n) % n],
+                "date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T15:00:00",
+                "odds": {
+                    market: {
+                        "bookmakers": {b: round(random.uniform(1.2, 6.0), 2) for b in BOOKMAKERS}
+                    }
+                    for market in MARKETS
+                },
+            }
+            for i in range(matches)
+        ],
+    }
+
+
+def bench_league_format(args):
+    data = season_data(args.matches)
+    wanted = random.sample(data["matches"], min(args.lookups, len(data["matches"])))
+    pairs = [(m["home_team"], m["away_team"]) for m in wanted]
+    codec = "zstd+msgpack" if cache_database.zstandard is not None else "zlib+json"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Database(str(Path(tmp) / "legacy.db"))
+        legacy.cache_league_data("football", "epl", "2025-06-15", data)
+        legacy_bytes = len(json.dumps(data))
+
+        db = CacheDatabase(str(Path(tmp) / "packed.db"))
+        db.cache_league_data("football", "epl", "2025-06-15", data)
+        packed_bytes = db.get_cache_stats()["league_cache_entries"]["bytes"]
+
+        def lazy_lookup():
+            loaded = db.get_cached_league_data("football", "epl", "2025-06-15")
+            by_pair = {(m["home_team"], m["away_team"]): m for m in loaded["matches"]}
+            return [by_pair[pair]["odds"] for pair in pairs]
+
+        results = {
+            "full load (legacy json)": timed(
+                lambda: legacy.get_cached_league_data("football", "epl", "2025-06-15"), args.repeat
+            ),
+            "full load, names only": timed(
+                lambda: db.get_cached_league_data("football", "epl", "2025-06-15"), args.repeat
+            ),
+            f"full load + decode {len(pairs)}": timed(lazy_lookup, args.repeat),
+            "full load + decode all": timed(
+                lambda: [dict(m) for m in db.get_cached_league_data("football", "epl", "2025-06-15")["matches"]],
+                args.repeat,
+            ),
+        }
+        legacy.close()
+        db.close()
+
+    print(f"{args.matches} matches, {len(MARKETS)} markets x {len(BOOKMAKERS)} bookmakers, codec {codec}")
+    print(f"{'entry size':32} {legacy_bytes:>10} bytes (json) {packed_bytes:>10} bytes (packed) "
+          f"{legacy_bytes / packed_bytes:5.1f}x")
+    print(f"{'read path':32} {'ms':>10}")
+    for name, ms in results.items():
+        print(f"{name:32} {ms:10.3f}")
+
+
+def bench_ingest(args):
+    bets = [
+        {
+            "bet_id": f"bet-{i}",
+            "sport": random.choice(SPORTS),
+            "tournament": random.choice(LEAGUES),
+            "home_team": f"Home {i % 97}",
+            "away_team": f"Away {i % 89}",
+            "market": random.choice(MARKETS),
+            "event_date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "bookmaker": random.choice(BOOKMAKERS),
+        }
+        for i in range(args.bets)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Database(str(Path(tmp) / "legacy.db"))
+        start = time.perf_counter()
+        legacy.create_job("job", len(bets))
+        for bet in bets:
+            legacy.create_bet_request(job_id="job", **bet)
+        legacy_s = time.perf_counter() - start
+        legacy.close()
+
+        db = CacheDatabase(str(Path(tmp) / "bulk.db"))
+        start = time.perf_counter()
+        db.create_job("job", len(bets))
+        db.add_bet_requests("job", bets)
+        bulk_s = time.perf_counter() - start
+        db.close()
+
+    print(f"{args.bets} bets")
+    print(f"{'create_bet_request loop':28} {legacy_s * 1000:10.1f} ms {args.bets / legacy_s:12.0f} bets/s")
+    print(f"{'add_bet_requests':28} {bulk_s * 1000:10.1f} ms {args.bets / bulk_s:12.0f} bets/s "
+          f"({legacy_s / bulk_s:.1f}x)")
+
+
+def bench_queries(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "bench.db")
+
+        db = Database(path)
+        seed(db, args.jobs, args.leagues)
+        before = {name: timed(func, args.repeat) for name, func in query_suite(db).items()}
+        db.close()
+
+        db = CacheDatabase(path)
+        after = {name: timed(func, args.repeat) for name, func in query_suite(db).items()}
+        db.close()
+
+    print(f"{'query':32} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:32} {before[name]:10.3f} {after[name]:10.3f} {speedup:7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    queries = sub.add_parser("queries", help="hot queries before/after migrations and pragmas")
+    queries.add_argument("--jobs", type=int, default=20000)
+    queries.add_argument("--leagues", type=int, default=5000)
+    queries.add_argument("--repeat", type=int, default=50)
+    queries.set_defaults(func=bench_queries)
+
+    league_format = sub.add_parser("league-format", help="league cache size and decode time, json vs per-match")
+    league_format.add_argument("--matches", type=int, default=380)
+    league_format.add_argument("--lookups", type=int, default=10)
+    league_format.add_argument("--repeat", type=int, default=50)
+    league_format.set_defaults(func=bench_league_format)
+
+    ingest = sub.add_parser("ingest", help="bet ingestion throughput, per-row vs bulk")
+    ingest.add_argument("--bets", type=int, default=5000)
+    ingest.set_defaults(func=bench_ingest)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark and recall check for bet-to-match lookup (MatchIndex vs linear scan).
+
+Builds a synthetic double round robin season, then matches bets written with
+the usual bookmaker spellings ("Man Utd", "Spurs", ...) against it, e.g.:
+
+    python bench_matching.py --teams 20 --bets 50
+
+Exits non-zero if trigram blocking drops a match the linear scan found.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+
+from bench_cache_db import timed
+from fuzzy_matcher import find_best_match
+from server_loader import load_server
+
+TEAMS = [
+    "Arsenal", "Chelsea", "Liverpool", "Manchester United", "Manchester City", "Tottenham Hotspur",
+    "Newcastle United", "Aston Villa", "West Ham United", "Brighton & Hove Albion",
+    "Wolverhampton Wanderers", "Everton", "Fulham", "Brentford", "Crystal Palace",
+    "Nottingham Forest", "Bournemouth", "Leeds United", "Burnley", "Sunderland",
+    "Leicester City", "Southampton", "Ipswich Town", "Sheffield United", "Luton Town",
+    "Norwich City", "Watford", "Middlesbrough", "Coventry City", "Stoke City",
+]
+# Bookmaker spellings that never match the scraped name exactly
+ALIASES = {
+    "Manchester United": "Man Utd",
+    "Manchester City": "Man City",
+    "Tottenham Hotspur": "Spurs",
+    "Wolverhampton Wanderers": "Wolves",
+    "Nottingham Forest": "Nottm Forest",
+    "Brighton & Hove Albion": "Brighton",
+    "West Ham United": "West Ham",
+    "Sheffield United": "Sheffield Utd",
+    "Arsenal": "Arsenal FC",
+}
+
+
+def linear_best_match(server, matches: list[dict], home: str, away: str) -> tuple[dict | None, float]:
+    """The pre-index lookup: fuzzy-score every match in the dataset."""
+    best_match, best_score = None, 0.0
+    for match in matches:
+        home_result = find_best_match(home, [server.normalize_team_name(match["home_team"])])
+        away_result = find_best_match(away, [server.normalize_team_name(match["away_team"])])
+        if home_result and away_result:
+            score = (home_result["score"] + away_result["score"]) / 2
+            if score > best_score:
+                best_match, best_score = match, score
+    return best_match, best_score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--bets", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    server = load_server()
+    random.seed(args.seed)
+
+    teams = TEAMS[:args.teams]
+    matches = [{"home_team": h, "away_team": a} for h in teams for a in teams if h != a]
+    fixtures = random.choices(matches, k=args.bets)
+    bets = [
+        (
+            server.normalize_team_name(ALIASES.get(m["home_team"], m["home_team"])),
+            server.normalize_team_name(ALIASES.get(m["away_team"], m["away_team"])),
+        )
+        for m in fixtures
+    ]
+
+    def run_linear():
+        return [linear_best_match(server, matches, home, away) for home, away in bets]
+
+    def run_indexed():
+        # Index build included: it happens once per group in _process_group
+        index = server.MatchIndex(matches)
+        return [index.best_match(home, away) for home, away in bets]
+
+    linear, indexed = run_linear(), run_indexed()
+    linear_ms, indexed_ms = timed(run_linear, args.repeat), timed(run_indexed, args.repeat)
+
+    # A match counts as found at the 0.5 threshold _match_bet_to_odds applies
+    found = [i for i, (match, score) in enumerate(linear) if match and score >= 0.5]
+    dropped = [i for i in found if not indexed[i][0] or indexed[i][1] < 0.5]
+    differs = [i for i in found if i not in dropped and indexed[i][0] is not linear[i][0]]
+    correct = sum(1 for i, (match, _) in enumerate(indexed) if match is fixtures[i])
+
+    print(f"{len(matches)} matches, {len(bets)} bets, {server.MATCH_CANDIDATE_LIMIT} candidates per bet")
+    print(f"{'linear scan':16} {linear_ms:10.1f} ms")
+    print(f"{'MatchIndex':16} {indexed_ms:10.1f} ms {linear_ms / indexed_ms:8.1f}x")
+    print(f"linear found {len(found)}, index dropped {len(dropped)}, picked a different match {len(differs)}, "
+          f"index picked the true fixture {correct}/{len(bets)}")
+    for i in dropped + differs:
+        (lm, ls), (im, iscore) = linear[i], indexed[i]
+        print(f"  {'DROPPED' if i in dropped else 'differs'}: {bets[i]} linear "
+              f"{(lm['home_team'], lm['away_team'])} {ls:.2f}, index "
+              f"{im and (im['home_team'], im['away_team'])} {iscore:.2f}")
+    if dropped:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1052 @@
+"""Batch and maintenance operations on top of database.Database (clv_cache.db)."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Iterator, Optional
+
+from database import Database
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = None
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Applied to every connection (these settings are per-connection in SQLite)
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # safe with WAL, no fsync per commit
+    "PRAGMA cache_size=-20000",  # ~20 MB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA recursive_triggers=ON",  # REPLACE deletions fire the cache_stats triggers
+)
+
+# Full recount of cache_stats (used when the table is created and to repair drift)
+CACHE_STATS_RECOUNT = [
+    """
+    INSERT OR REPLACE INTO cache_stats (table_name, row_count, oldest_entry, newest_entry)
+    SELECT 'closing_odds_cache', COUNT(*), MIN(scraped_at), MAX(scraped_at) FROM closing_odds_cache
+    """,
+    """
+    INSERT OR REPLACE INTO cache_stats (table_name, row_count)
+    SELECT 'league_cache', COUNT(*) FROM league_cache
+    """,
+]
+
+# cache_stats rows whose total_bytes is maintained by triggers; the legacy
+# tables' payload columns belong to the base Database, so they only track counts
+BYTE_TRACKED_TABLES = {"league_cache_entries"}
+
+# Same for the per-match league cache (created by migration 3)
+LEAGUE_ENTRIES_RECOUNT = """
+    INSERT OR REPLACE INTO cache_stats (table_name, row_count, total_bytes, oldest_entry, newest_entry)
+    SELECT 'league_cache_entries', COUNT(*), COALESCE(SUM(stored_bytes), 0), MIN(scraped_at), MAX(scraped_at)
+    FROM league_cache_entries
+"""
+
+# Schema migrations, applied in order; the index of the last applied one is
+# PRAGMA user_version, written in the migration's own transaction
+MIGRATIONS: list[list[str]] = [
+    # 1: indexes for the hot lookups (job dispatch, failure rate, league cache, cache stats)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_bet_requests_job ON bet_requests(job_id)",
+        "CREATE INDEX IF NOT EXISTS idx_league_cache_lookup ON league_cache(sport, league, event_date)",
+        "CREATE INDEX IF NOT EXISTS idx_closing_odds_scraped ON closing_odds_cache(scraped_at)",
+    ],
+    # 2: cache_stats maintained by triggers, so /health never scans the cache tables
+    [
+        """
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            table_name TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            total_bytes INTEGER NOT NULL DEFAULT 0,
+            oldest_entry INTEGER,
+            newest_entry INTEGER
+        )
+        """,
+        *CACHE_STATS_RECOUNT,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_closing_odds_stats_insert
+        AFTER INSERT ON closing_odds_cache
+        BEGIN
+            UPDATE cache_stats SET
+                row_count = row_count + 1,
+                oldest_entry = CASE WHEN oldest_entry IS NULL OR NEW.scraped_at < oldest_entry
+                               THEN NEW.scraped_at ELSE oldest_entry END,
+                newest_entry = CASE WHEN newest_entry IS NULL OR NEW.scraped_at > newest_entry
+                               THEN NEW.scraped_at ELSE newest_entry END
+            WHERE table_name = 'closing_odds_cache';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_closing_odds_stats_update
+        AFTER UPDATE OF scraped_at ON closing_odds_cache
+        BEGIN
+            UPDATE cache_stats SET
+                oldest_entry = (SELECT MIN(scraped_at) FROM closing_odds_cache),
+                newest_entry = (SELECT MAX(scraped_at) FROM closing_odds_cache)
+            WHERE table_name = 'closing_odds_cache';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_closing_odds_stats_delete
+        AFTER DELETE ON closing_odds_cache
+        BEGIN
+            UPDATE cache_stats SET
+                row_count = row_count - 1,
+                oldest_entry = CASE WHEN OLD.scraped_at <= oldest_entry
+                               THEN (SELECT MIN(scraped_at) FROM closing_odds_cache) ELSE oldest_entry END,
+                newest_entry = CASE WHEN OLD.scraped_at >= newest_entry
+                               THEN (SELECT MAX(scraped_at) FROM closing_odds_cache) ELSE newest_entry END
+            WHERE table_name = 'closing_odds_cache';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_league_cache_stats_insert
+        AFTER INSERT ON league_cache
+        BEGIN
+            UPDATE cache_stats SET row_count = row_count + 1 WHERE table_name = 'league_cache';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_league_cache_stats_delete
+        AFTER DELETE ON league_cache
+        BEGIN
+            UPDATE cache_stats SET row_count = row_count - 1 WHERE table_name = 'league_cache';
+        END
+        """,
+    ],
+    # 3: league cache stored per match - plain team names, compressed odds payload
+    [
+        """
+        CREATE TABLE IF NOT EXISTS league_cache_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sport TEXT NOT NULL,
+            league TEXT NOT NULL,
+            event_date TEXT NOT NULL,
+            header TEXT NOT NULL,
+            match_count INTEGER NOT NULL,
+            raw_bytes INTEGER NOT NULL,
+            stored_bytes INTEGER NOT NULL,
+            scraped_at INTEGER NOT NULL,
+            UNIQUE (sport, league, event_date)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS league_cache_matches (
+            entry_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            pair_key TEXT NOT NULL,
+            home_team TEXT NOT NULL,
+            away_team TEXT NOT NULL,
+            match_date TEXT,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (entry_id, position)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_league_cache_matches_pair ON league_cache_matches(entry_id, pair_key)",
+        LEAGUE_ENTRIES_RECOUNT,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_league_entries_delete
+        AFTER DELETE ON league_cache_entries
+        BEGIN
+            DELETE FROM league_cache_matches WHERE entry_id = OLD.id;
+            UPDATE cache_stats SET
+                row_count = row_count - 1,
+                total_bytes = total_bytes - OLD.stored_bytes
+            WHERE table_name = 'league_cache_entries';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_league_entries_insert
+        AFTER INSERT ON league_cache_entries
+        BEGIN
+            UPDATE cache_stats SET
+                row_count = row_count + 1,
+                total_bytes = total_bytes + NEW.stored_bytes,
+                oldest_entry = CASE WHEN oldest_entry IS NULL OR NEW.scraped_at < oldest_entry
+                               THEN NEW.scraped_at ELSE oldest_entry END,
+                newest_entry = CASE WHEN newest_entry IS NULL OR NEW.scraped_at > newest_entry
+                               THEN NEW.scraped_at ELSE newest_entry END
+            WHERE table_name = 'league_cache_entries';
+        END
+        """,
+    ],
+    # 4: LRU bookkeeping for size-based eviction
+    [
+        "ALTER TABLE league_cache_entries ADD COLUMN last_access INTEGER",
+        "UPDATE league_cache_entries SET last_access = scraped_at",
+        "CREATE INDEX IF NOT EXISTS idx_league_entries_access ON league_cache_entries(last_access)",
+        "CREATE INDEX IF NOT EXISTS idx_league_entries_scraped ON league_cache_entries(scraped_at)",
+        # Keep oldest/newest right as eviction removes entries from either end
+        "DROP TRIGGER IF EXISTS trg_league_entries_delete",
+        """
+        CREATE TRIGGER trg_league_entries_delete
+        AFTER DELETE ON league_cache_entries
+        BEGIN
+            DELETE FROM league_cache_matches WHERE entry_id = OLD.id;
+            UPDATE cache_stats SET
+                row_count = row_count - 1,
+                total_bytes = total_bytes - OLD.stored_bytes,
+                oldest_entry = CASE WHEN OLD.scraped_at <= oldest_entry
+                               THEN (SELECT MIN(scraped_at) FROM league_cache_entries) ELSE oldest_entry END,
+                newest_entry = CASE WHEN OLD.scraped_at >= newest_entry
+                               THEN (SELECT MAX(scraped_at) FROM league_cache_entries) ELSE newest_entry END
+            WHERE table_name = 'league_cache_entries';
+        END
+        """,
+    ],
+    # 5: negative cache for scrapes that came back empty
+    [
+        """
+        CREATE TABLE IF NOT EXISTS negative_cache (
+            sport TEXT NOT NULL,
+            league TEXT NOT NULL,
+            event_date TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            failures INTEGER NOT NULL DEFAULT 1,
+            first_failed INTEGER NOT NULL,
+            last_failed INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL,
+            PRIMARY KEY (sport, league, event_date)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_negative_cache_expires ON negative_cache(expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_negative_cache_last_failed ON negative_cache(last_failed)",
+    ],
+    # 6: per-job commit sequence for streaming results with resume
+    [
+        "ALTER TABLE bet_requests ADD COLUMN result_seq INTEGER",
+        "ALTER TABLE jobs ADD COLUMN result_seq INTEGER NOT NULL DEFAULT 0",
+        """
+        UPDATE bet_requests SET result_seq = id - (
+            SELECT MIN(b.id) FROM bet_requests b WHERE b.job_id = bet_requests.job_id
+        ) + 1
+        WHERE fallback_type IS NOT NULL
+        """,
+        """
+        UPDATE jobs SET result_seq = COALESCE(
+            (SELECT MAX(result_seq) FROM bet_requests WHERE job_id = jobs.id), 0
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_bet_requests_job_seq ON bet_requests(job_id, result_seq)",
+    ],
+    # 7: resolved results reusable across jobs, keyed by result_key()
+    [
+        """
+        CREATE TABLE IF NOT EXISTS result_store (
+            result_key TEXT PRIMARY KEY,
+            bet_id TEXT NOT NULL,
+            closing_odds REAL NOT NULL,
+            bookmaker_used TEXT,
+            fallback_type TEXT,
+            confidence REAL,
+            match_score REAL,
+            source_fingerprint TEXT,
+            resolved_at INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_result_store_resolved ON result_store(resolved_at)",
+    ],
+    # 8: which scrape each league entry holds, so stored results retire with it
+    [
+        "ALTER TABLE league_cache_entries ADD COLUMN fingerprint TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_league_entries_fingerprint ON league_cache_entries(fingerprint)",
+    ],
+]
+
+# SQLite's default bound-parameter limit is 999; IN (...) lookups are chunked below it
+LOOKUP_CHUNK_SIZE = 500
+
+NEGATIVE_CACHE_COLUMNS = ("sport", "league", "event_date", "reason", "failures",
+                          "first_failed", "last_failed", "expires_at")
+
+# Payload codecs for league_cache_matches, tagged by their first byte
+CODEC_ZSTD_MSGPACK = b"Z"
+CODEC_ZLIB_JSON = b"J"
+PAYLOAD_COMPRESSION_LEVEL = 3
+
+# The fields of a match kept as plain columns; everything else goes in the payload
+MATCH_COLUMNS = ("home_team", "away_team", "date")
+
+
+def result_key(bet_id: str, market: str, bookmaker: str, event_date: str) -> str:
+    """Content address of a bet's closing-odds result."""
+    parts = (bet_id, market, (bookmaker or "").casefold(), event_date)
+    return hashlib.sha1("\x1f".join(p.strip() for p in parts).encode()).hexdigest()
+
+
+def league_fingerprint(sport: str, league: str, event_date: str, data: dict) -> str:
+    """Short hash identifying one scrape of a league (the data results are matched against)."""
+    parts = (sport, league, event_date, data.get("source"), data.get("scraped_at"), len(data.get("matches", [])))
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:16]
+
+
+def match_pair_key(home: str, away: str) -> str:
+    """Case- and punctuation-insensitive key for a home/away pair."""
+    def clean(name: str) -> str:
+        return "".join(c for c in (name or "").casefold() if c.isalnum())
+
+    return f"{clean(home)}|{clean(away)}"
+
+
+def encode_payload(data: dict) -> bytes:
+    """Compress one match's odds payload (zstd+msgpack when installed, else zlib+json)."""
+    if zstandard is not None:
+        packed = msgpack.packb(data, use_bin_type=True)
+        return CODEC_ZSTD_MSGPACK + zstandard.ZstdCompressor(level=PAYLOAD_COMPRESSION_LEVEL).compress(packed)
+    packed = json.dumps(data, separators=(",", ":")).encode()
+    return CODEC_ZLIB_JSON + zlib.compress(packed, PAYLOAD_COMPRESSION_LEVEL)
+
+
+def decode_payload(payload: bytes) -> dict:
+    """Inverse of encode_payload."""
+    codec, body = payload[:1], payload[1:]
+    if codec == CODEC_ZSTD_MSGPACK:
+        if zstandard is None:
+            raise RuntimeError("League cache entry needs zstandard and msgpack to decode")
+        return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(body), raw=False)
+    return json.loads(zlib.decompress(body))
+
+
+class LeagueData(dict):
+    """A league cache entry; raw_bytes is the size of its matches as JSON."""
+
+    raw_bytes: int = 0
+
+
+class LazyMatch(Mapping):
+    """A cached match whose odds payload is only decoded on first access.
+
+    Team names and date are available straight from their columns, so
+    building a MatchIndex over a season does not decode a single payload.
+    """
+
+    __slots__ = ("_fields", "_payload")
+
+    def __init__(self, home_team: str, away_team: str, match_date: Optional[str], payload: bytes):
+        self._fields = {"home_team": home_team, "away_team": away_team, "date": match_date}
+        self._payload = payload
+
+    @property
+    def decoded(self) -> bool:
+        return self._payload is None
+
+    def _decode(self) -> dict:
+        if self._payload is not None:
+            self._fields.update(decode_payload(self._payload))
+            self._payload = None
+        return self._fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key in MATCH_COLUMNS:
+            return self._fields[key]
+        return self._decode()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._decode())
+
+    def __len__(self) -> int:
+        return len(self._decode())
+
+
+class CacheDatabase(Database):
+    """Database with tuned connections, schema migrations and bulk write paths."""
+
+    def __init__(self, db_path: str):
+        self._tuned = threading.local()
+        # (sport, league, event_date) -> last read time, flushed to league_cache_entries by the writer
+        self._touched: dict[tuple[str, str, str], int] = {}
+        self._touched_lock = threading.Lock()
+        new_file = not os.path.exists(db_path) or os.path.getsize(db_path) == 0
+        super().__init__(db_path)
+        self.migrate()
+        if new_file:
+            # Converting costs a full VACUUM; on a brand-new file that is instant
+            self.enable_incremental_vacuum()
+        elif not self.has_incremental_vacuum():
+            logger.info(
+                "Incremental auto-vacuum is off for this cache database; run "
+                "'python cache_database.py enable-incremental-vacuum' during maintenance "
+                "to let eviction return space gradually"
+            )
+
+    def _get_connection(self):
+        conn = super()._get_connection()
+        if getattr(self._tuned, "conn", None) is not conn:
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._tuned.conn = conn
+        return conn
+
+    def migrate(self) -> int:
+        """Enable WAL and apply pending schema migrations; returns the schema version."""
+        conn = self._get_connection()
+        if conn.in_transaction:
+            conn.commit()
+        # WAL lets readers run while the job writer commits
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target in range(version + 1, len(MIGRATIONS) + 1):
+            # Statements and version commit together, so a crash can't leave
+            # a non-repeatable ALTER TABLE applied but unrecorded
+            with self._transaction() as tx:
+                for statement in MIGRATIONS[target - 1]:
+                    tx.execute(statement)
+                tx.execute(f"PRAGMA user_version = {target}")
+            logger.info(f"Applied cache database migration {target}")
+
+        if version < len(MIGRATIONS):
+            conn.execute("ANALYZE")
+        return len(MIGRATIONS)
+
+    def has_incremental_vacuum(self) -> bool:
+        return self._get_connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    def enable_incremental_vacuum(self):
+        """Switch the file to auto_vacuum=INCREMENTAL.
+
+        Needs one full VACUUM, which rewrites the whole file: run it as a
+        maintenance step (see __main__), not on a live server's startup path.
+        """
+        if self.has_incremental_vacuum():
+            return
+        conn = self._get_connection()
+        if conn.in_transaction:
+            conn.commit()
+        logger.info("Converting cache database to incremental auto-vacuum (one-time VACUUM)...")
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+
+    @contextmanager
+    def _transaction(self):
+        """Run a block in one transaction (joins an already open one)."""
+        conn = self._get_connection()
+        nested = conn.in_transaction
+        if not nested:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            if not nested:
+                conn.rollback()
+            raise
+        else:
+            if not nested:
+                conn.commit()
+
+    def get_cache_stats(self) -> dict:
+        """Row counts, bytes and oldest/newest timestamps per cache table, in O(1).
+
+        "bytes" is None for tables whose size is not tracked.
+        """
+        conn = self._get_connection()
+        rows = conn.execute(
+            "SELECT table_name, row_count, total_bytes, oldest_entry, newest_entry FROM cache_stats"
+        ).fetchall()
+        stats = {
+            row[0]: {
+                "rows": row[1],
+                "bytes": row[2] if row[0] in BYTE_TRACKED_TABLES else None,
+                "oldest": row[3],
+                "newest": row[4],
+            }
+            for row in rows
+        }
+
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        stats["database"] = {
+            "bytes": page_size * page_count,
+            "free_bytes": page_size * free_pages,
+        }
+        return stats
+
+    def count_pending_jobs(self) -> int:
+        """Number of queued or processing jobs (index-only count)."""
+        conn = self._get_connection()
+        return conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'processing')"
+        ).fetchone()[0]
+
+    def refresh_cache_stats(self):
+        """Recount cache_stats from the tables (repairs drift from writers without the triggers)."""
+        with self._transaction() as conn:
+            for statement in (*CACHE_STATS_RECOUNT, LEAGUE_ENTRIES_RECOUNT):
+                conn.execute(statement)
+
+    def cache_league_data(self, sport: str, league: str, event_date: str, data: dict):
+        """Store a scrape result as one row per match, replacing any previous entry."""
+        header = {k: v for k, v in data.items() if k != "matches"}
+        rows = []
+        raw_bytes = stored_bytes = 0
+        for position, match in enumerate(data.get("matches", [])):
+            home, away = match.get("home_team", ""), match.get("away_team", "")
+            extra = {k: v for k, v in match.items() if k not in MATCH_COLUMNS}
+            payload = encode_payload(extra)
+            raw_bytes += len(json.dumps(match))
+            stored_bytes += len(payload) + len(home) + len(away)
+            rows.append(
+                (position, match_pair_key(home, away), home, away, match.get("date"), payload)
+            )
+
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM league_cache_entries WHERE sport = ? AND league = ? AND event_date = ?",
+                (sport, league, event_date),
+            )
+            cursor = conn.execute(
+                """
+                INSERT INTO league_cache_entries
+                    (sport, league, event_date, header, match_count, raw_bytes, stored_bytes,
+                     scraped_at, last_access, fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (sport, league, event_date, json.dumps(header), len(rows),
+                 raw_bytes, stored_bytes, int(time.time()), int(time.time()),
+                 league_fingerprint(sport, league, event_date, data)),
+            )
+            entry_id = cursor.lastrowid
+            conn.executemany(
+                """
+                INSERT INTO league_cache_matches
+                    (entry_id, position, pair_key, home_team, away_team, match_date, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(entry_id, *row) for row in rows],
+            )
+
+    def get_cached_league_data(self, sport: str, league: str, event_date: str) -> Optional[LeagueData]:
+        """Load a league entry with lazily decoded matches (falls back to the legacy table)."""
+        conn = self._get_connection()
+        entry = conn.execute(
+            """
+            SELECT id, header, raw_bytes FROM league_cache_entries
+            WHERE sport = ? AND league = ? AND event_date = ?
+            """,
+            (sport, league, event_date),
+        ).fetchone()
+        if entry is None:
+            return super().get_cached_league_data(sport, league, event_date)
+
+        self.touch_league_data(sport, league, event_date)
+
+        rows = conn.execute(
+            """
+            SELECT home_team, away_team, match_date, payload FROM league_cache_matches
+            WHERE entry_id = ? ORDER BY position
+            """,
+            (entry[0],),
+        ).fetchall()
+        data = LeagueData(json.loads(entry[1]))
+        data.raw_bytes = entry[2]
+        data["matches"] = [LazyMatch(row[0], row[1], row[2], row[3]) for row in rows]
+        return data
+
+    def touch_league_data(self, sport: str, league: str, event_date: str):
+        """Record a read of a league entry (also from in-memory caches) for LRU eviction."""
+        with self._touched_lock:
+            self._touched[(sport, league, event_date)] = int(time.time())
+
+    def flush_access_times(self) -> int:
+        """Persist the last-read times recorded by readers (called on the writer)."""
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            with self._transaction() as conn:
+                conn.executemany(
+                    """
+                    UPDATE league_cache_entries SET last_access = MAX(COALESCE(last_access, 0), ?)
+                    WHERE sport = ? AND league = ? AND event_date = ?
+                    """,
+                    [(ts, *key) for key, ts in touched.items()],
+                )
+        return len(touched)
+
+    def evict_cache_batch(self, cutoff: int, max_bytes: Optional[int], batch_size: int) -> dict:
+        """Delete one bounded batch of expired or least recently used cache rows.
+
+        Removes up to batch_size league entries scraped before cutoff (or, once
+        none are left, the least recently read ones while the league cache is
+        over max_bytes), plus up to batch_size expired closing odds and legacy
+        league rows. Returns the per-table counts; all zero means done.
+        """
+        deleted = {"leagues": 0, "odds": 0, "legacy_leagues": 0, "negative": 0, "results": 0}
+        with self._transaction() as conn:
+            deleted["leagues"] = conn.execute(
+                """
+                DELETE FROM league_cache_entries WHERE id IN (
+                    SELECT id FROM league_cache_entries WHERE scraped_at <= ? LIMIT ?
+                )
+                """,
+                (cutoff, batch_size),
+            ).rowcount
+
+            if not deleted["leagues"] and max_bytes is not None:
+                total = conn.execute(
+                    "SELECT total_bytes FROM cache_stats WHERE table_name = 'league_cache_entries'"
+                ).fetchone()
+                excess = total[0] - max_bytes if total else 0
+                if excess > 0:
+                    victims = []
+                    for entry_id, stored_bytes in conn.execute(
+                        "SELECT id, stored_bytes FROM league_cache_entries ORDER BY last_access LIMIT ?",
+                        (batch_size,),
+                    ):
+                        victims.append((entry_id,))
+                        excess -= stored_bytes
+                        if excess <= 0:
+                            break
+                    conn.executemany("DELETE FROM league_cache_entries WHERE id = ?", victims)
+                    deleted["leagues"] = len(victims)
+
+            deleted["odds"] = conn.execute(
+                """
+                DELETE FROM closing_odds_cache WHERE rowid IN (
+                    SELECT rowid FROM closing_odds_cache WHERE scraped_at <= ? LIMIT ?
+                )
+                """,
+                (cutoff, batch_size),
+            ).rowcount
+
+            deleted["negative"] = conn.execute(
+                """
+                DELETE FROM negative_cache WHERE (sport, league, event_date) IN (
+                    SELECT sport, league, event_date FROM negative_cache WHERE last_failed <= ? LIMIT ?
+                )
+                """,
+                (cutoff, batch_size),
+            ).rowcount
+
+            deleted["results"] = conn.execute(
+                """
+                DELETE FROM result_store WHERE result_key IN (
+                    SELECT result_key FROM result_store WHERE resolved_at <= ? LIMIT ?
+                )
+                """,
+                (cutoff, batch_size),
+            ).rowcount
+
+            if self._legacy_league_has_scraped_at(conn):
+                deleted["legacy_leagues"] = conn.execute(
+                    """
+                    DELETE FROM league_cache WHERE rowid IN (
+                        SELECT rowid FROM league_cache WHERE scraped_at <= ? LIMIT ?
+                    )
+                    """,
+                    (cutoff, batch_size),
+                ).rowcount
+        return deleted
+
+    def _legacy_league_has_scraped_at(self, conn) -> bool:
+        if not hasattr(self, "_legacy_scraped_at"):
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(league_cache)")}
+            self._legacy_scraped_at = "scraped_at" in columns
+        return self._legacy_scraped_at
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """Return up to `pages` free pages to the filesystem; returns the pages still free."""
+        conn = self._get_connection()
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+        return conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def get_negative_entry(self, sport: str, league: str, event_date: str) -> Optional[dict]:
+        """The active negative cache entry for a group, or None if it may be scraped."""
+        row = self._get_connection().execute(
+            f"""
+            SELECT {", ".join(NEGATIVE_CACHE_COLUMNS)} FROM negative_cache
+            WHERE sport = ? AND league = ? AND event_date = ? AND expires_at > ?
+            """,
+            (sport, league, event_date, int(time.time())),
+        ).fetchone()
+        return dict(zip(NEGATIVE_CACHE_COLUMNS, row)) if row else None
+
+    def record_negative(
+        self, sport: str, league: str, event_date: str, reason: str, base_ttl: int, max_ttl: int
+    ) -> dict:
+        """Record an empty scrape; the suppression TTL doubles with each consecutive failure.
+
+        A change of reason starts the count (and the TTL) over.
+        """
+        now = int(time.time())
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO negative_cache
+                    (sport, league, event_date, reason, failures, first_failed, last_failed, expires_at)
+                VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+                ON CONFLICT (sport, league, event_date) DO UPDATE SET
+                    reason = excluded.reason,
+                    failures = CASE WHEN reason = excluded.reason THEN failures + 1 ELSE 1 END,
+                    last_failed = excluded.last_failed,
+                    expires_at = excluded.last_failed + CASE WHEN reason = excluded.reason
+                        THEN MIN(?, ? * (1 << MIN(failures, 20))) ELSE MIN(?, ?) END
+                """,
+                (sport, league, event_date, reason, now, now, now + min(base_ttl, max_ttl),
+                 max_ttl, base_ttl, max_ttl, base_ttl),
+            )
+            row = conn.execute(
+                f"""
+                SELECT {", ".join(NEGATIVE_CACHE_COLUMNS)} FROM negative_cache
+                WHERE sport = ? AND league = ? AND event_date = ?
+                """,
+                (sport, league, event_date),
+            ).fetchone()
+        return dict(zip(NEGATIVE_CACHE_COLUMNS, row))
+
+    def clear_negative(self, sport: str, league: str, event_date: str):
+        """Forget failures for a group once it has been scraped successfully."""
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM negative_cache WHERE sport = ? AND league = ? AND event_date = ?",
+                (sport, league, event_date),
+            )
+
+    def clear_negative_reasons(self, reasons: list[str]) -> int:
+        """Forget negative entries with the given reason codes; returns how many."""
+        with self._transaction() as conn:
+            return conn.execute(
+                f"DELETE FROM negative_cache WHERE reason IN ({','.join('?' * len(reasons))})",
+                reasons,
+            ).rowcount
+
+    def get_negative_entries(self) -> list[dict]:
+        """All currently suppressed groups, soonest to expire first."""
+        rows = self._get_connection().execute(
+            f"""
+            SELECT {", ".join(NEGATIVE_CACHE_COLUMNS)} FROM negative_cache
+            WHERE expires_at > ? ORDER BY expires_at
+            """,
+            (int(time.time()),),
+        ).fetchall()
+        return [dict(zip(NEGATIVE_CACHE_COLUMNS, row)) for row in rows]
+
+    def save_bet_results(
+        self,
+        results: list[tuple[int, dict]],
+        job_id: Optional[str] = None,
+        processed_bets: Optional[int] = None,
+        store: Optional[list[tuple[str, str, dict]]] = None,
+        source_fingerprint: Optional[str] = None,
+    ) -> int:
+        """Write (bet row id, result) pairs, and optionally job progress, in one transaction.
+
+        With a job_id, each result is stamped with the job's next result_seq so
+        readers can resume from the last sequence number they saw. Resolved
+        (result_key, bet_id, result) entries in `store` are kept in result_store for
+        later jobs, tagged with the league_fingerprint() of the data they came
+        from. Callers only pass results matched against closing odds.
+        """
+        with self._transaction() as conn:
+            seq = None
+            if job_id is not None:
+                row = conn.execute("SELECT result_seq FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                seq = row[0] if row else None
+
+            rows = [
+                (
+                    result.get("closingOdds"),
+                    result.get("bookmakerUsed"),
+                    result.get("fallbackType"),
+                    result.get("confidence"),
+                    result.get("matchScore"),
+                    seq + i + 1 if seq is not None else None,
+                    bet_row_id,
+                )
+                for i, (bet_row_id, result) in enumerate(results)
+            ]
+            conn.executemany(
+                """
+                UPDATE bet_requests
+                SET result_odds = ?, result_bookmaker = ?, fallback_type = ?,
+                    confidence = ?, match_score = ?, result_seq = COALESCE(?, result_seq)
+                WHERE id = ?
+                """,
+                rows,
+            )
+            if seq is not None:
+                conn.execute(
+                    "UPDATE jobs SET result_seq = ? WHERE id = ?", (seq + len(rows), job_id)
+                )
+            if job_id is not None and processed_bets is not None:
+                conn.execute(
+                    "UPDATE jobs SET processed_bets = ? WHERE id = ?",
+                    (processed_bets, job_id),
+                )
+            if store:
+                now = int(time.time())
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO result_store
+                        (result_key, bet_id, closing_odds, bookmaker_used, fallback_type,
+                         confidence, match_score, source_fingerprint, resolved_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (key, bet_id, result["closingOdds"], result.get("bookmakerUsed"),
+                         result.get("fallbackType"), result.get("confidence"),
+                         result.get("matchScore"), source_fingerprint, now)
+                        for key, bet_id, result in store
+                        if result.get("closingOdds") is not None
+                    ],
+                )
+
+        return len(rows)
+
+    def lookup_results(self, keys: list[str]) -> dict[str, dict]:
+        """Stored results by result_key (missing keys are simply absent).
+
+        A result only counts while the league data it was matched against is
+        still cached: once its league is re-scraped or evicted, the bet is
+        matched again.
+        """
+        conn = self._get_connection()
+        found = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            for row in conn.execute(
+                f"""
+                SELECT r.result_key, r.closing_odds, r.bookmaker_used, r.fallback_type,
+                       r.confidence, r.match_score
+                FROM result_store r
+                JOIN league_cache_entries e ON e.fingerprint = r.source_fingerprint
+                WHERE r.result_key IN ({",".join("?" * len(chunk))})
+                """,
+                chunk,
+            ):
+                found[row[0]] = {
+                    "closingOdds": row[1],
+                    "bookmakerUsed": row[2],
+                    "fallbackType": row[3],
+                    "confidence": row[4],
+                    "matchScore": row[5],
+                }
+        return found
+
+    def add_bet_requests(self, job_id: str, bets: list[dict]) -> dict:
+        """Insert a job's bets in one transaction, de-duplicated by bet_id (first wins).
+
+        Bets already in result_store are inserted with their stored result
+        (and a result_seq), so only the rest need processing. Sets
+        jobs.total_bets/processed_bets and returns {"total": n, "resolved": k}.
+        """
+        unique: dict[str, dict] = {}
+        for bet in bets:
+            unique.setdefault(bet["bet_id"], bet)
+        keys = [
+            result_key(bet["bet_id"], bet["market"], bet["bookmaker"], bet["event_date"])
+            for bet in unique.values()
+        ]
+
+        with self._transaction() as conn:
+            stored = self.lookup_results(keys)
+            rows = []
+            resolved = 0
+            for bet, key in zip(unique.values(), keys):
+                result = stored.get(key)
+                if result:
+                    resolved += 1
+                rows.append((
+                    job_id,
+                    bet["bet_id"],
+                    bet["sport"],
+                    bet.get("tournament") or "",
+                    bet["home_team"],
+                    bet["away_team"],
+                    bet["market"],
+                    bet["event_date"],
+                    bet["bookmaker"],
+                    result["closingOdds"] if result else None,
+                    result["bookmakerUsed"] if result else None,
+                    result["fallbackType"] if result else None,
+                    result["confidence"] if result else None,
+                    result["matchScore"] if result else None,
+                    resolved if result else None,
+                ))
+
+            conn.executemany(
+                """
+                INSERT INTO bet_requests
+                    (job_id, bet_id, sport, tournament, home_team, away_team, market, event_date, bookmaker,
+                     result_odds, result_bookmaker, fallback_type, confidence, match_score, result_seq)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.execute(
+                "UPDATE jobs SET total_bets = ?, processed_bets = ?, result_seq = ? WHERE id = ?",
+                (len(unique), resolved, resolved, job_id),
+            )
+
+        if len(unique) < len(bets):
+            logger.info(f"Dropped {len(bets) - len(unique)} duplicate bet ids from job {job_id}")
+        return {"total": len(unique), "resolved": resolved}
+
+    def get_job_state(self, job_id: str) -> Optional[dict]:
+        """Status, progress and latest result_seq of a job (one primary-key read)."""
+        row = self._get_connection().execute(
+            "SELECT status, total_bets, processed_bets, error_log, result_seq FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("status", "total_bets", "processed_bets", "error_log", "result_seq"), row))
+
+    def get_bet_results_since(self, job_id: str, since: int, limit: int) -> list[dict]:
+        """Bet rows whose results were committed after sequence number `since`, in commit order."""
+        cursor = self._get_connection().execute(
+            """
+            SELECT * FROM bet_requests
+            WHERE job_id = ? AND result_seq > ?
+            ORDER BY result_seq LIMIT ?
+            """,
+            (job_id, since, limit),
+        )
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class AsyncDatabase:
+    """Awaitable facade that keeps SQLite work off the event loop.
+
+    Writes run on one dedicated writer thread, so they are serialised. Reads
+    run on a small pool of reader threads. Each thread gets its own connection
+    from Database._get_connection(). Database methods are reached as
+    coroutines, e.g. ``await adb.get_job(job_id)``. Arbitrary functions of
+    the sync database go through read()/write().
+    """
+
+    READ_METHODS = {
+        "get_job",
+        "get_jobs_by_status",
+        "get_bet_requests",
+        "get_bet_results",
+        "get_cached_league_data",
+        "get_negative_entry",
+        "get_negative_entries",
+        "get_job_state",
+        "get_bet_results_since",
+        "lookup_results",
+        "get_metadata",
+    }
+
+    def __init__(self, database: CacheDatabase, readers: int = 2):
+        self.db = database
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clv-db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=max(1, readers), thread_name_prefix="clv-db-reader")
+
+    async def read(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a read-only callable on a reader thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, partial(func, *args, **kwargs)
+        )
+
+    async def write(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a callable on the writer thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._writer, partial(func, *args, **kwargs)
+        )
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+
+        run = self.read if name in self.READ_METHODS else self.write
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def evict_cache(
+        self,
+        retention_days: int,
+        max_bytes: Optional[int] = None,
+        batch_size: int = 500,
+        vacuum_pages: int = 2000,
+        pause: float = 0.05,
+    ) -> dict:
+        """Evict expired and over-budget cache rows in small writer-thread batches.
+
+        Job writes queue on the same writer thread, so they run between batches
+        instead of waiting for the whole eviction. Freed pages are then handed
+        back with incremental vacuum, vacuum_pages at a time.
+        """
+        database = self.db
+        cutoff = int(time.time()) - retention_days * 86400
+        start_bytes = (await self.read(database.get_cache_stats))["database"]["bytes"]
+
+        await self.write(database.flush_access_times)
+        totals = {"leagues": 0, "odds": 0, "legacy_leagues": 0, "negative": 0, "results": 0}
+        while True:
+            deleted = await self.write(database.evict_cache_batch, cutoff, max_bytes, batch_size)
+            for key, count in deleted.items():
+                totals[key] += count
+            if not any(deleted.values()):
+                break
+            await asyncio.sleep(pause)
+
+        free_pages = None
+        while True:
+            remaining = await self.write(database.incremental_vacuum, vacuum_pages)
+            if not remaining or (free_pages is not None and remaining >= free_pages):
+                break
+            free_pages = remaining
+            await asyncio.sleep(pause)
+
+        end_bytes = (await self.read(database.get_cache_stats))["database"]["bytes"]
+        return {
+            "leagues": totals["leagues"] + totals["legacy_leagues"],
+            "odds": totals["odds"],
+            "negative": totals["negative"],
+            "results": totals["results"],
+            "freed_mb": round((start_bytes - end_bytes) / (1024 * 1024), 2),
+        }
+
+    def close(self):
+        """Close the writer connection and stop the worker threads."""
+        try:
+            self._writer.submit(self.db.close).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"Failed to close writer connection: {e}")
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Cache database maintenance")
+    parser.add_argument("command", choices=["enable-incremental-vacuum"])
+    parser.add_argument("--db", default=str(Path(__file__).parent / "clv_cache.db"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    database = CacheDatabase(args.db)
+    database.enable_incremental_vacuum()
+    database.close()
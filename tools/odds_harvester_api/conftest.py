@@ -0,0 +1,113 @@
+"""Shared fixtures for the cache database, job processor and job API tests.
+
+cache_database.py and server.py import database, fuzzy_matcher and
+league_mapper, which are not part of this directory; tests that need a
+module that can't be imported are skipped (see require_modules).
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from server_loader import load_server
+
+# Everything server.py imports beyond the standard library and cache_database
+SERVER_MODULES = (
+    "database", "fuzzy_matcher", "league_mapper", "fastapi", "httpx", "apscheduler", "pydantic", "requests",
+)
+
+BET = {
+    "sport": "football",
+    "tournament": "EPL",
+    "home_team": "Arsenal",
+    "away_team": "Chelsea",
+    "market": "1X2",
+    "event_date": "2025-12-01",
+    "bookmaker": "bet365",
+}
+
+LEAGUE_DATA = {
+    "source": "oddsharvester",
+    "scraped_at": "2025-12-02T00:00:00",
+    "matches": [
+        {
+            "home_team": "Arsenal",
+            "away_team": "Chelsea",
+            "date": "2025-12-01",
+            "odds": {"1X2": {"bookmakers": {"pinnacle": 2.1}}},
+        }
+    ],
+}
+
+
+def require_modules(*names: str):
+    """Skip the calling test module unless every named module imports."""
+    for name in names:
+        pytest.importorskip(name)
+
+
+def bet_rows(*bet_ids: str) -> list[dict]:
+    """bet_requests rows (as add_bet_requests takes them) for BET under each id."""
+    return [{**BET, "bet_id": bet_id} for bet_id in bet_ids]
+
+
+def run_processor(server, cache_db, scenario):
+    """Run scenario(processor, async_db) on a fresh JobProcessor over cache_db."""
+    from cache_database import AsyncDatabase
+
+    async def main():
+        async_db = AsyncDatabase(cache_db)
+        processor = server.JobProcessor(async_db, max_workers=2)
+        try:
+            return await scenario(processor, async_db)
+        finally:
+            await processor.stop()
+            async_db.close()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def cache_db(tmp_path):
+    from cache_database import CacheDatabase
+
+    database = CacheDatabase(str(tmp_path / "cache.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """server module with its database in tmp_path and scraping stubbed.
+
+    Scrapes return LEAGUE_DATA; set ``server.scrape_delay`` to slow them down.
+    """
+    module = load_server()
+    module.scrape_calls = []
+    module.scrape_delay = 0.0
+
+    async def scrape(self, sport, league, event_date, sources):
+        module.scrape_calls.append((sport, league, event_date))
+        await asyncio.sleep(module.scrape_delay)
+        return LEAGUE_DATA
+
+    monkeypatch.setattr(module, "CACHE_DB_PATH", str(tmp_path / "clv_cache.db"))
+    monkeypatch.setattr(module.JobProcessor, "_scrape_league", scrape)
+    monkeypatch.setattr(module, "run_health_check", lambda: None)
+    monkeypatch.setattr(module, "get_odds_harvester_version", lambda: "unknown")
+
+    def offline(*args, **kwargs):
+        raise OSError("network disabled in tests")
+
+    monkeypatch.setattr("urllib.request.urlopen", offline)
+    return module
+
+
+@pytest.fixture
+def client(server):
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as test_client:
+        yield test_client
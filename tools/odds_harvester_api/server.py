@@ -24,30 +24,78 @@ import sys
 import threading
 import time
 import uuid
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict, deque
 from concurrent.futures import ThreadPoolExecutor
-from contextlib import asynccontextmanager
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
+import httpx
 from apscheduler.schedulers.background import BackgroundScheduler
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from cache_database import AsyncDatabase, CacheDatabase, LeagueData, league_fingerprint, result_key
 from database import Database
 from fuzzy_matcher import find_best_match
-from league_mapper import detect_league, get_league_mappings, log_unmapped_league
+from league_mapper import detect_league, get_league_mappings, log_unmapped_league, update_custom_mappings
 
 # Configuration from environment variables
 ODDS_HARVESTER_PATH = os.getenv(
     "ODDS_HARVESTER_PATH", str(Path(__file__).parent / "OddsHarvester")
 )
 MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "3"))
+MAX_ACTIVE_JOBS = int(os.getenv("MAX_ACTIVE_JOBS", str(MAX_CONCURRENCY * 2)))
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", str(MAX_CONCURRENCY)))
+BROWSER_MAX_SCRAPES = int(os.getenv("BROWSER_MAX_SCRAPES", "25"))
+BROWSER_IDLE_TIMEOUT = int(os.getenv("BROWSER_IDLE_TIMEOUT", "600"))
+SEASON_CACHE_TTL = int(os.getenv("SEASON_CACHE_TTL", str(6 * 3600)))
+SEASON_CACHE_MAX_ENTRIES = int(os.getenv("SEASON_CACHE_MAX_ENTRIES", "32"))
+LEAGUE_MEMORY_CACHE_ENTRIES = int(os.getenv("LEAGUE_MEMORY_CACHE_ENTRIES", "64"))
+LEAGUE_MEMORY_CACHE_MB = float(os.getenv("LEAGUE_MEMORY_CACHE_MB", "128"))
+LEAGUE_MEMORY_CACHE_TTL = int(os.getenv("LEAGUE_MEMORY_CACHE_TTL", "900"))
+NEGATIVE_CACHE_MAX_TTL = int(os.getenv("NEGATIVE_CACHE_MAX_TTL", str(7 * 86400)))
+# First suppression period per reason; doubles on every consecutive failure
+NEGATIVE_CACHE_BASE_TTL = {
+    "unknown_league": int(os.getenv("NEGATIVE_CACHE_UNKNOWN_TTL", "3600")),
+    "unmapped": int(os.getenv("NEGATIVE_CACHE_UNMAPPED_TTL", "3600")),
+    "no_matches": int(os.getenv("NEGATIVE_CACHE_EMPTY_TTL", "900")),
+}
+# Scrape errors (timeouts, HTTP errors, refused quota) back off for a fixed, short period
+NEGATIVE_CACHE_ERROR_TTL = int(os.getenv("NEGATIVE_CACHE_ERROR_TTL", "300"))
+ODDS_API_CACHE_TTL = int(os.getenv("ODDS_API_CACHE_TTL", "900"))
+ODDS_API_MIN_QUOTA = int(os.getenv("ODDS_API_MIN_QUOTA", "10"))
+ODDS_API_REGIONS = "us,uk,eu"
+ODDS_API_MARKETS = "h2h,spreads,totals"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "10"))
+MATCH_CANDIDATE_LIMIT = int(os.getenv("MATCH_CANDIDATE_LIMIT", "8"))
+LEAGUE_DETECT_MEMO_SIZE = int(os.getenv("LEAGUE_DETECT_MEMO_SIZE", "4096"))
+PROGRESS_FLUSH_COUNT = int(os.getenv("PROGRESS_FLUSH_COUNT", "50"))
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "2.0"))
+
+# Per-host timeout and retry policy for outbound HTTP
+HTTP_HOST_POLICIES = {
+    "api.the-odds-api.com": {"timeout": 15.0, "retries": 2, "backoff": 1.0},
+}
+DEFAULT_HTTP_POLICY = {"timeout": 10.0, "retries": 1, "backoff": 0.5}
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", str(Path(__file__).parent / "clv_cache.db"))
 CACHE_RETENTION_DAYS = int(os.getenv("CACHE_RETENTION_DAYS", "30"))
+CACHE_MAX_MB = float(os.getenv("CACHE_MAX_MB", "0"))  # 0 = no size limit
+EVICTION_BATCH_SIZE = int(os.getenv("EVICTION_BATCH_SIZE", "500"))
 API_HOST = os.getenv("API_HOST", "127.0.0.1")
 API_PORT = int(os.getenv("API_PORT", "8765"))
+DB_READER_THREADS = int(os.getenv("DB_READER_THREADS", "2"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "200"))
+STREAM_HEARTBEAT_INTERVAL = float(os.getenv("STREAM_HEARTBEAT_INTERVAL", "15"))
+JOB_STATUS_PAGE_SIZE = int(os.getenv("JOB_STATUS_PAGE_SIZE", "500"))
+SMALL_BATCH_WAIT = float(os.getenv("SMALL_BATCH_WAIT", "25"))
+SMALL_BATCH_MAX_WAIT = float(os.getenv("SMALL_BATCH_MAX_WAIT", "120"))
+JOB_STATUS_MAX_PAGE_SIZE = int(os.getenv("JOB_STATUS_MAX_PAGE_SIZE", "5000"))
+HEALTH_REFRESH_INTERVAL = float(os.getenv("HEALTH_REFRESH_INTERVAL", "15"))
+HEALTH_MIN_REFRESH_INTERVAL = float(os.getenv("HEALTH_MIN_REFRESH_INTERVAL", "1"))
 
 # Shared config directory (accessible by both extension and server)
 if os.name == 'nt':  # Windows
@@ -57,6 +105,7 @@ else:  # macOS/Linux
 
 SHARED_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 SHARED_CONFIG_PATH = SHARED_CONFIG_DIR / 'config.json'
+SOURCE_MAPPINGS_PATH = Path(os.getenv("SOURCE_MAPPINGS_PATH", str(SHARED_CONFIG_DIR / 'source_mappings.json')))
 
 # Try to get The Odds API key from multiple sources (PRIORITY ORDER)
 # 1. Shared config.json (preferred - used by extension)
@@ -104,77 +153,569 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Global state
-db: Optional[Database] = None
+db: Optional[CacheDatabase] = None
+async_db: Optional[AsyncDatabase] = None
 job_processor: Optional["JobProcessor"] = None
 scheduler: Optional[BackgroundScheduler] = None
+http_client: Optional[httpx.AsyncClient] = None
+health_monitor: Optional["HealthMonitor"] = None
 
 
 # === Helper Functions ===
 
-def map_to_odds_api_sport(sport: str, league: str) -> Optional[str]:
-    """Map sport/league to The Odds API sport key."""
-    sport_lower = sport.lower()
-    league_lower = league.lower()
-    
-    if sport_lower in ['football', 'soccer']:
-        if 'premier' in league_lower or 'epl' in league_lower:
-            return 'soccer_epl'
-        elif 'la liga' in league_lower or 'spain' in league_lower:
-            return 'soccer_spain_la_liga'
-        elif 'bundesliga' in league_lower or 'germany' in league_lower:
-            return 'soccer_germany_bundesliga'
-        elif 'serie a' in league_lower or 'italy' in league_lower:
-            return 'soccer_italy_serie_a'
-        elif 'ligue 1' in league_lower or 'france' in league_lower:
-            return 'soccer_france_ligue_one'
-        elif 'champions' in league_lower:
-            return 'soccer_uefa_champs_league'
+# Sport name variants -> canonical sport
+SPORT_ALIASES = {
+    "soccer": "football",
+    "hockey": "ice hockey",
+    "nfl": "american football",
+}
+
+# Canonical sport -> OddsHarvester sport slug (sports OddsHarvester can scrape)
+ODDSHARVESTER_SPORTS = {
+    "football": "football",
+    "basketball": "basketball",
+    "tennis": "tennis",
+    "ice hockey": "ice-hockey",
+    "baseball": "baseball",
+}
+
+# One row per competition: (sport, league aliases, Odds API key, OddsHarvester league)
+SOURCE_MAPPINGS = [
+    ("football", ["premier league", "english premier league", "epl", "england-premier-league"], "soccer_epl", "england-premier-league"),
+    ("football", ["la liga", "spain la liga", "spain-primera-division"], "soccer_spain_la_liga", "spain-primera-division"),
+    ("football", ["bundesliga", "germany-bundesliga"], "soccer_germany_bundesliga", "germany-bundesliga"),
+    ("football", ["serie a", "italy-serie-a"], "soccer_italy_serie_a", "italy-serie-a"),
+    ("football", ["ligue 1", "france-ligue-1"], "soccer_france_ligue_one", "france-ligue-1"),
+    ("football", ["champions league", "uefa champions league", "europe-champions-league"], "soccer_uefa_champs_league", "europe-champions-league"),
+    ("basketball", ["nba", "usa-nba"], "basketball_nba", "nba"),  # OddsHarvester expects just 'nba'
+    ("tennis", ["atp", "atp-singles"], "tennis_atp", "atp-singles"),
+    ("tennis", ["wta", "wta-singles"], "tennis_wta", "wta-singles"),
+    ("american football", ["nfl", "usa-nfl"], "americanfootball_nfl", None),
+    ("ice hockey", ["nhl", "usa-nhl"], "icehockey_nhl", "nhl"),
+    ("baseball", ["mlb", "usa-mlb"], "baseball_mlb", "mlb"),
+]
+
+
+def mapping_tokens(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens of a sport or league name."""
+    return "".join(c if c.isalnum() else " " for c in (text or "").casefold()).split()
+
+
+class SourceRegistry:
+    """Compiled sport/league -> Odds API key and OddsHarvester params.
+
+    Built once from SOURCE_MAPPINGS plus the custom rows in
+    SOURCE_MAPPINGS_PATH (custom rows win). A league resolves only on an
+    exact alias after normalisation; otherwise its slug is passed through
+    to OddsHarvester unchanged and the Odds API is reported as unmapped,
+    never guessed from partial words.
+    """
+
+    def __init__(self, rows: list[tuple], custom_path: Optional[Path] = None):
+        self.custom_path = custom_path
+        self._stats: dict[str, int] = defaultdict(int)
+        self._lookup_ns = 0
+        self._max_lookup_ns = 0
+        self._unmapped: Counter = Counter()
+        self._compile(rows + self._load_custom_rows())
+
+    def _load_custom_rows(self) -> list[tuple]:
+        """Rows from the custom mappings file: [{"sport", "aliases", "odds_api", "oddsharvester"}]."""
+        if not self.custom_path or not self.custom_path.exists():
+            return []
+        try:
+            with open(self.custom_path) as f:
+                rows = [
+                    (row["sport"], row["aliases"], row.get("odds_api"), row.get("oddsharvester"))
+                    for row in json.load(f)
+                ]
+            logger.info(f"🗺️ Loaded {len(rows)} custom source mappings from {self.custom_path}")
+            return rows
+        except Exception as e:
+            logger.error(f"❌ Ignoring custom source mappings in {self.custom_path}: {e}")
+            return []
+
+    def _compile(self, rows: list[tuple]):
+        exact: dict[tuple[str, str], dict] = {}
+        sports = set(ODDSHARVESTER_SPORTS)
+
+        for sport, aliases, odds_api_key, oh_league in rows:
+            sport = self.canonical_sport(sport)
+            sports.add(sport)
+            entry = {"odds_api": odds_api_key, "oddsharvester": oh_league}
+            for alias in aliases:
+                tokens = mapping_tokens(alias)
+                if not tokens:
+                    continue
+                exact[(sport, " ".join(tokens))] = entry
+
+        self._exact = exact
+        self._sports = sports
+        self._row_count = len(rows)
+
+    @staticmethod
+    def canonical_sport(sport: str) -> str:
+        name = " ".join(mapping_tokens(sport))
+        return SPORT_ALIASES.get(name, name)
+
+    def resolve(self, sport: str, league: str) -> dict:
+        """Resolve a sport/league to source keys.
+
+        Returns {"mapped", "match", "odds_api", "oddsharvester", "reason"};
+        "match" is exact/slug, "reason" is set when nothing matched.
+        """
+        start = time.perf_counter_ns()
+        result = self._resolve(sport, league)
+
+        elapsed = time.perf_counter_ns() - start
+        self._lookup_ns += elapsed
+        self._max_lookup_ns = max(self._max_lookup_ns, elapsed)
+        self._stats["lookups"] += 1
+        if result["match"] == "exact":
+            self._stats["exact"] += 1
+            if result["odds_api"]:
+                self._stats["odds_api_keys"] += 1
         else:
-            return 'soccer_epl'
-    elif sport_lower == 'basketball':
-        return 'basketball_nba'
-    elif sport_lower == 'tennis':
-        return 'tennis_atp' if 'atp' in league_lower or 'men' in league_lower else 'tennis_wta'
-    elif sport_lower in ['american football', 'nfl']:
-        return 'americanfootball_nfl'
-    elif sport_lower in ['ice hockey', 'hockey']:
-        return 'icehockey_nhl'
-    elif sport_lower == 'baseball':
-        return 'baseball_mlb'
-    
+            # A slug passthrough is a guess with no Odds API key, so it is
+            # reported as unmapped too (it's what a new alias should cover)
+            self._stats["slug" if result["match"] == "slug" else f"unmapped_{result['reason']}"] += 1
+            # Bounded so a stream of junk league names can't grow it forever
+            if (sport, league) in self._unmapped or len(self._unmapped) < 200:
+                self._unmapped[(sport, league)] += 1
+        return result
+
+    def _resolve(self, sport: str, league: str) -> dict:
+        canonical = self.canonical_sport(sport)
+        tokens = mapping_tokens(league)
+        oh_sport = ODDSHARVESTER_SPORTS.get(canonical)
+
+        def result(match=None, entry=None, reason=None) -> dict:
+            oh_league = entry["oddsharvester"] if entry else None
+            if oh_sport and not oh_league and match == "slug":
+                oh_league = league.lower().replace(" ", "-")
+            return {
+                "mapped": match is not None,
+                "match": match,
+                "odds_api": entry["odds_api"] if entry else None,
+                "oddsharvester": (oh_sport, oh_league) if oh_sport and oh_league else None,
+                "reason": reason,
+            }
+
+        if canonical not in self._sports:
+            return result(reason="unknown_sport")
+        if tokens in ([], ["unknown"]):
+            return result(reason="unknown_league")
+
+        entry = self._exact.get((canonical, " ".join(tokens)))
+        if entry:
+            return result("exact", entry)
+
+        # OddsHarvester league slugs are used as-is when no alias matches
+        if oh_sport:
+            return result("slug")
+        return result(reason="no_alias")
+
+    def get_stats(self) -> dict:
+        lookups = self._stats["lookups"]
+        return {
+            **self._stats,
+            "rows": self._row_count,
+            "aliases": len(self._exact),
+            "coverage": round(self._stats["exact"] / lookups, 4) if lookups else None,
+            "odds_api_coverage": round(self._stats["odds_api_keys"] / lookups, 4) if lookups else None,
+            "avg_lookup_us": round(self._lookup_ns / lookups / 1000, 2) if lookups else 0,
+            "max_lookup_us": round(self._max_lookup_ns / 1000, 2),
+            "top_unmapped": [
+                {"sport": sport, "league": league, "count": count}
+                for (sport, league), count in self._unmapped.most_common(10)
+            ],
+        }
+
+
+source_registry = SourceRegistry(SOURCE_MAPPINGS, SOURCE_MAPPINGS_PATH)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the shared keep-alive HTTP client (HTTP/2 when h2 is installed)."""
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=60.0,
+        ),
+        timeout=httpx.Timeout(DEFAULT_HTTP_POLICY["timeout"]),
+        headers={"User-Agent": "OddsHarvester-CLV-API"},
+    )
+
+
+async def http_get(url: str, params: Optional[dict] = None) -> httpx.Response:
+    """GET through the shared client, retrying transport errors, 429 and 5xx with backoff."""
+    global http_client
+
+    if http_client is None:
+        http_client = create_http_client()
+
+    policy = HTTP_HOST_POLICIES.get(httpx.URL(url).host, DEFAULT_HTTP_POLICY)
+    attempts = policy["retries"] + 1
+
+    for attempt in range(attempts):
+        delay = policy["backoff"] * (2 ** attempt)
+        try:
+            response = await http_client.get(url, params=params, timeout=policy["timeout"])
+        except httpx.TransportError as e:
+            if attempt == attempts - 1:
+                raise
+            logger.warning(f"⚠️ HTTP {type(e).__name__} for {url}, retrying in {delay:.1f}s")
+        else:
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            if attempt == attempts - 1:
+                return response
+            retry_after = response.headers.get("retry-after", "")
+            if retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            logger.warning(f"⚠️ HTTP {response.status_code} for {url}, retrying in {delay:.1f}s")
+
+        await asyncio.sleep(delay)
+
+
+def parse_match_date(value: Any) -> Optional[date]:
+    """Parse an OddsHarvester start_date ("2025-12-01", "01.12.2025" or ISO timestamp)."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        if '-' in value:
+            return datetime.fromisoformat(value.split('T')[0]).date()
+        elif '.' in value:
+            # DD.MM.YYYY format
+            parts = value.split('.')
+            return datetime(int(parts[2]), int(parts[1]), int(parts[0])).date()
+    except Exception as e:
+        logger.debug(f"Failed to parse date '{value}': {e}")
     return None
 
 
-def map_to_oddsharvester_params(sport: str, league: str) -> Optional[tuple]:
-    """Map sport/league to OddsHarvester format (sport, league)."""
-    sport_map = {
-        'football': 'football',
-        'soccer': 'football',
-        'basketball': 'basketball',
-        'tennis': 'tennis',
-        'ice hockey': 'ice-hockey',
-        'baseball': 'baseball'
-    }
-    
-    league_map = {
-        'premier league': 'england-premier-league',
-        'epl': 'england-premier-league',
-        'england-premier-league': 'england-premier-league',
-        'la liga': 'spain-primera-division',
-        'serie a': 'italy-serie-a',
-        'bundesliga': 'germany-bundesliga',
-        'ligue 1': 'france-ligue-1',
-        'champions league': 'europe-champions-league',
-        'nba': 'nba',  # OddsHarvester expects just 'nba', not 'usa-nba'
-        'usa-nba': 'nba',  # Map our internal format to OddsHarvester format
-        'atp': 'atp-singles',
-        'wta': 'wta-singles'
+def transform_oddsharvester_match(match_data: dict, event_date: str) -> dict:
+    """Convert an OddsHarvester match record to our matches[] format."""
+    match = {
+        'home_team': match_data.get('home_team', ''),
+        'away_team': match_data.get('away_team', ''),
+        'date': match_data.get('start_date', event_date),
+        'odds': {}
     }
     
-    oh_sport = sport_map.get(sport.lower())
-    oh_league = league_map.get(league.lower(), league.lower().replace(' ', '-'))
+    markets_data = match_data.get('markets', {})
+    for market_name, market_data in markets_data.items():
+        if not isinstance(market_data, dict):
+            continue
+        
+        formatted_market = {
+            '1x2': '1X2',
+            'over_under_2_5': 'Over/Under 2.5',
+            'btts': 'Both Teams to Score'
+        }.get(market_name, market_name)
+        
+        match['odds'][formatted_market] = {'bookmakers': {}}
+        
+        # Extract bookmaker odds from market data
+        for key, value in market_data.items():
+            if isinstance(value, list):
+                for entry in value:
+                    if isinstance(entry, dict):
+                        bookie = entry.get('bookmaker_name', '').lower()
+                        
+                        # Get odds value
+                        odds_val = None
+                        if '1' in entry:
+                            odds_val = float(entry['1'])
+                        elif 'odds_over' in entry:
+                            odds_val = float(entry['odds_over'])
+                        else:
+                            for k, v in entry.items():
+                                if k not in ['bookmaker_name', 'period'] and isinstance(v, (int, float, str)):
+                                    try:
+                                        odds_val = float(v)
+                                        break
+                                    except:
+                                        pass
+                        
+                        if odds_val and bookie:
+                            match['odds'][formatted_market]['bookmakers'][bookie] = odds_val
     
-    return (oh_sport, oh_league) if oh_sport else None
+    return match
+
+
+class SeasonIndex:
+    """A season scrape, indexed by match date.
+
+    Records are filtered by date first and only the requested date's matches
+    are transformed (once), each on its own, so one malformed record costs
+    that match rather than the season.
+    """
+
+    def __init__(self, records: list[dict]):
+        self.created = time.time()
+        self.scraped_at = datetime.now().isoformat()
+        self.records = records
+        self.by_date: dict[date, list[dict]] = defaultdict(list)
+        self._transformed: dict[date, list[dict]] = {}
+
+        for record in records:
+            match_date = parse_match_date(record.get('start_date'))
+            if match_date:
+                self.by_date[match_date].append(record)
+
+    def matches_on(self, target_date: date, event_date: str) -> list[dict]:
+        """Transformed matches with odds on target_date."""
+        matches = self._transformed.get(target_date)
+        if matches is None:
+            matches = []
+            for record in self.by_date.get(target_date, []):
+                try:
+                    match = transform_oddsharvester_match(record, event_date)
+                except (TypeError, ValueError, AttributeError) as e:
+                    logger.warning(
+                        f"⚠️ Skipping malformed OddsHarvester match "
+                        f"{record.get('home_team')} vs {record.get('away_team')}: {e}"
+                    )
+                    continue
+                if match['odds']:
+                    matches.append(match)
+            self._transformed[target_date] = matches
+        return matches
+
+
+def team_name_grams(name: str) -> set[str]:
+    """Character trigrams of each (space-padded) token, used for candidate blocking."""
+    grams = set()
+    for token in name.split():
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class MatchIndex:
+    """Pre-normalised team names for one dataset, with exact and trigram lookups.
+
+    Built once per scraped_data and shared by every bet in the group, so each
+    bet only fuzzy-scores the few matches that share trigrams with its teams.
+    """
+
+    def __init__(self, matches: list[dict]):
+        self.matches = matches
+        self.names: list[tuple[str, str]] = []
+        self.exact: dict[tuple[str, str], int] = {}
+        self.home_grams: dict[str, set[int]] = defaultdict(set)
+        self.away_grams: dict[str, set[int]] = defaultdict(set)
+
+        for i, match in enumerate(matches):
+            pair = (
+                normalize_team_name(match.get("home_team", "")),
+                normalize_team_name(match.get("away_team", "")),
+            )
+            self.names.append(pair)
+            self.exact.setdefault(pair, i)
+            for gram in team_name_grams(pair[0]):
+                self.home_grams[gram].add(i)
+            for gram in team_name_grams(pair[1]):
+                self.away_grams[gram].add(i)
+
+    def candidates(self, home: str, away: str, limit: int = MATCH_CANDIDATE_LIMIT) -> list[int]:
+        """Indexes of the matches whose home and away names share the most trigrams with the bet."""
+        counts: Counter = Counter()
+        for name, grams_index in ((home, self.home_grams), (away, self.away_grams)):
+            grams = team_name_grams(name)
+            if not grams:
+                continue
+            # Weight by query size so a long name on one side can't swamp the other
+            weight = 1.0 / len(grams)
+            for gram in grams:
+                for i in grams_index.get(gram, ()):
+                    counts[i] += weight
+
+        if not counts:
+            # Nothing in common at all - fall back to a full scan
+            return list(range(len(self.matches)))
+        return [i for i, _ in counts.most_common(limit)]
+
+    def best_match(self, home: str, away: str) -> tuple[Optional[dict], float]:
+        """Best-scoring match for normalised team names, and its score."""
+        exact = self.exact.get((home, away))
+        if exact is not None:
+            return self.matches[exact], 1.0
+
+        best_match = None
+        best_score = 0.0
+        for i in self.candidates(home, away):
+            match_home, match_away = self.names[i]
+
+            # Calculate match score
+            home_result = find_best_match(home, [match_home])
+            away_result = find_best_match(away, [match_away])
+
+            if home_result and away_result:
+                score = (home_result["score"] + away_result["score"]) / 2
+                if score > best_score:
+                    best_score = score
+                    best_match = self.matches[i]
+        return best_match, best_score
+
+
+# Scrape sources whose odds are closing odds; only their results are reusable across jobs
+# (The Odds API returns current odds, which keep moving until kick-off)
+CLOSING_ODDS_SOURCES = ("oddsharvester",)
+
+
+def bet_request_row(bet: "BetRequest") -> dict:
+    """bet_requests column values for an incoming bet."""
+    return {
+        "bet_id": bet.betId,
+        "sport": bet.sport,
+        "tournament": bet.tournament or "",
+        "home_team": bet.homeTeam,
+        "away_team": bet.awayTeam,
+        "market": bet.market,
+        "event_date": bet.eventDate,
+        "bookmaker": bet.bookmaker,
+    }
+
+
+class LeagueDetector:
+    """Bounded memo in front of league_mapper.detect_league.
+
+    Keyed by the case- and whitespace-normalised (home, away, tournament,
+    sport), so repeated fixtures in a batch are detected once. Cleared
+    whenever the league mappings change.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._memo: OrderedDict[tuple, Optional[dict]] = OrderedDict()
+        self._stats: dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _key(home: str, away: str, tournament: str, sport: str) -> tuple:
+        return tuple(" ".join((value or "").casefold().split()) for value in (home, away, tournament, sport))
+
+    def detect(self, home: str, away: str, tournament: str, sport: str) -> Optional[dict]:
+        """detect_league() result for the bet, memoised (including misses)."""
+        key = self._key(home, away, tournament, sport)
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            self._stats["hits"] += 1
+            return self._memo[key]
+
+        self._stats["misses"] += 1
+        league_info = detect_league(home, away, tournament, sport)
+        self._memo[key] = league_info
+        if len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+            self._stats["evictions"] += 1
+        return league_info
+
+    def invalidate(self):
+        """Forget every memoised detection (league mappings changed)."""
+        self._memo.clear()
+        self._stats["invalidations"] += 1
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "entries": len(self._memo), "max_entries": self.max_entries}
+
+
+def format_bet_result(bet_req: dict) -> dict:
+    """Public shape of one bet result (as returned by the batch and stream endpoints)."""
+    return {
+        "bet_id": bet_req["bet_id"],
+        "success": bet_req.get("result_odds") is not None,
+        "error": bet_req.get("error"),
+        "closing_odds": bet_req.get("result_odds"),
+        "match_score": bet_req.get("match_score"),
+        "bookmaker_used": bet_req.get("result_bookmaker"),
+        "fallback_type": bet_req.get("fallback_type"),
+        "confidence": bet_req.get("confidence")
+    }
+
+
+class LeagueMemoryCache:
+    """In-process LRU of league datasets and their MatchIndex, in front of SQLite.
+
+    Bounded by entry count and (estimated) bytes; entries expire after ttl
+    seconds so a re-scrape written by another process is picked up eventually.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[dict, MatchIndex, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._stats: dict[str, int] = defaultdict(int)
+
+    def get(self, key: tuple) -> Optional[tuple[dict, MatchIndex]]:
+        """Cached (data, index) for key, or None on a miss or expired entry."""
+        entry = self._entries.get(key)
+        if entry and time.time() - entry[3] < self.ttl:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0], entry[1]
+        if entry:
+            self._stats["expired"] += 1
+            self._remove(key)
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, key: tuple, data: dict) -> tuple[dict, MatchIndex]:
+        """Index data once and keep it; returns (data, index)."""
+        index = MatchIndex(data.get("matches", []))
+        size = self._estimate_bytes(data)
+        if size > self.max_bytes:
+            self._stats["oversized"] += 1
+            return data, index
+
+        self._remove(key)
+        self._entries[key] = (data, index, size, time.time())
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+        return data, index
+
+    def invalidate(self, key: Optional[tuple] = None):
+        """Drop one entry, or everything when key is None."""
+        if key is None:
+            self._entries.clear()
+            self._bytes = 0
+        else:
+            self._remove(key)
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry[2]
+
+    @staticmethod
+    def _estimate_bytes(data: dict) -> int:
+        # Decoded size of the matches; SQLite entries carry it, fresh scrapes are measured
+        if isinstance(data, LeagueData) and data.raw_bytes:
+            return data.raw_bytes
+        return len(json.dumps(data, default=str))
 
 
 # === Pydantic Models ===
@@ -218,6 +759,10 @@ class JobStatusResponse(BaseModel):
     progress: dict
     results: list[dict]
     error: Optional[str] = None
+    # Delta/paged requests only: last seq included (pass as since next time)
+    seq: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 class HealthResponse(BaseModel):
@@ -233,6 +778,7 @@ class HealthResponse(BaseModel):
     active_concurrency: int
     recommended_concurrency: int
     health_state: str
+    snapshot_age: Optional[float] = None
 
 
 class CacheStatsResponse(BaseModel):
@@ -257,37 +803,420 @@ class UpdateCheckResponse(BaseModel):
 # === Job Processing ===
 
 
+class FlightAborted(Exception):
+    """Raised to followers when the leader of a single-flight call was cancelled."""
+
+
+class ScrapeFailed(Exception):
+    """A scrape source errored (timeout, HTTP error, refused quota), as opposed to finding no matches."""
+
+
+class ScrapeScheduler:
+    """Global scrape concurrency budget shared by all jobs.
+
+    Free slots are handed out round-robin between jobs so one large job
+    cannot starve the others. The limit can be changed at runtime.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._active_by_job: dict[str, int] = defaultdict(int)
+        self._waiters: OrderedDict[str, deque] = OrderedDict()
+
+    def set_limit(self, limit: int):
+        """Change the budget; extra waiters are woken immediately."""
+        self.limit = max(1, limit)
+        self._wake()
+
+    async def acquire(self, job_id: str):
+        """Wait for a scrape slot on behalf of job_id."""
+        if self.active < self.limit and not self._waiters:
+            self._grant(job_id)
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job_id, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # Slot was granted just before cancellation - give it back
+            if fut.done() and not fut.cancelled():
+                self.release(job_id)
+            raise
+
+    def release(self, job_id: str):
+        """Return a scrape slot."""
+        self.active -= 1
+        self._active_by_job[job_id] -= 1
+        if self._active_by_job[job_id] <= 0:
+            del self._active_by_job[job_id]
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, job_id: str):
+        """Hold a scrape slot for the duration of the block."""
+        await self.acquire(job_id)
+        try:
+            yield
+        finally:
+            self.release(job_id)
+
+    def snapshot(self) -> dict:
+        """Current budget usage."""
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": sum(len(q) for q in self._waiters.values()),
+            "active_by_job": dict(self._active_by_job),
+        }
+
+    def _grant(self, job_id: str):
+        self.active += 1
+        self._active_by_job[job_id] += 1
+
+    def _wake(self):
+        while self.active < self.limit and self._waiters:
+            # Serve the job at the head, then rotate it to the back
+            job_id, queue = next(iter(self._waiters.items()))
+            fut = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(job_id)
+            else:
+                del self._waiters[job_id]
+
+            if fut.cancelled():
+                continue
+            self._grant(job_id)
+            fut.set_result(None)
+
+
+class PooledBrowser:
+    """A started OddsHarvester scraper and its usage bookkeeping."""
+
+    def __init__(self, scraper: Any):
+        self.scraper = scraper
+        self.scrapes = 0
+        self.last_used = time.time()
+        self.broken = False
+
+
+class BrowserPool:
+    """Long-lived pool of headless OddsHarvester browsers.
+
+    Callers lease a started scraper and return it when done. Browsers are
+    recycled after BROWSER_MAX_SCRAPES scrapes, after an error, when they
+    fail a health check, or when they have been idle too long.
+    """
+
+    def __init__(self, size: int, max_scrapes: int, idle_timeout: int):
+        self.size = max(1, size)
+        self.max_scrapes = max(1, max_scrapes)
+        self.idle_timeout = idle_timeout
+        self._idle: list[PooledBrowser] = []
+        self._total = 0
+        self._closed = False
+        self._cond = asyncio.Condition()
+        self._stats: dict[str, int] = defaultdict(int)
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the periodic health check / idle reaper."""
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def close(self):
+        """Stop all idle browsers; leased ones are stopped when returned."""
+        async with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+        for browser in idle:
+            await self._destroy(browser)
+
+    def get_stats(self) -> dict:
+        """Pool usage counters."""
+        return {
+            **self._stats,
+            "size": self.size,
+            "open": self._total,
+            "idle": len(self._idle),
+        }
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow a started scraper for the duration of the block."""
+        browser = await self._acquire()
+        try:
+            yield browser.scraper
+        except BaseException:
+            # Timeouts and crashes leave the page in an unknown state
+            browser.broken = True
+            raise
+        finally:
+            await self._release(browser)
+
+    async def _acquire(self) -> PooledBrowser:
+        stale: list[PooledBrowser] = []
+        try:
+            async with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Browser pool is closed")
+
+                    while self._idle:
+                        browser = self._idle.pop()
+                        if self._is_healthy(browser):
+                            self._stats["reused"] += 1
+                            return browser
+                        self._total -= 1
+                        stale.append(browser)
+
+                    if self._total < self.size:
+                        self._total += 1
+                        break
+
+                    await self._cond.wait()
+        finally:
+            for browser in stale:
+                self._stats["unhealthy"] += 1
+                await self._destroy(browser)
+
+        try:
+            browser = await self._create()
+        except BaseException:
+            async with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+        self._stats["started"] += 1
+        return browser
+
+    async def _release(self, browser: PooledBrowser):
+        browser.scrapes += 1
+        browser.last_used = time.time()
+
+        recycle = (
+            self._closed
+            or browser.broken
+            or browser.scrapes >= self.max_scrapes
+            or not self._is_healthy(browser)
+        )
+
+        if recycle:
+            self._stats["recycled"] += 1
+            await self._destroy(browser)
+
+        async with self._cond:
+            if recycle:
+                self._total -= 1
+            else:
+                self._idle.append(browser)
+            self._cond.notify()
+
+    async def _create(self) -> PooledBrowser:
+        """Start a new headless browser."""
+        # Import OddsHarvester components
+        src_path = str(Path(ODDS_HARVESTER_PATH) / "src")
+        if src_path not in sys.path:
+            sys.path.insert(0, src_path)
+        from core.odds_portal_scraper import OddsPortalScraper
+        from core.playwright_manager import PlaywrightManager
+        from core.browser_helper import BrowserHelper
+        from core.odds_portal_market_extractor import OddsPortalMarketExtractor
+
+        logger.info(f"🧭 Starting pooled browser ({self._total}/{self.size})")
+
+        browser_helper = BrowserHelper()
+        scraper = OddsPortalScraper(
+            playwright_manager=PlaywrightManager(),
+            browser_helper=browser_helper,
+            market_extractor=OddsPortalMarketExtractor(browser_helper),
+            preview_submarkets_only=False
+        )
+
+        # Start browser with timeout
+        await asyncio.wait_for(
+            scraper.start_playwright(headless=True),
+            timeout=30
+        )
+        return PooledBrowser(scraper)
+
+    async def _destroy(self, browser: PooledBrowser):
+        try:
+            await asyncio.wait_for(browser.scraper.stop_playwright(), timeout=15)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to stop pooled browser cleanly: {e}")
+
+    def _is_healthy(self, browser: PooledBrowser) -> bool:
+        if browser.broken:
+            return False
+        manager = getattr(browser.scraper, "playwright_manager", None)
+        pw_browser = getattr(manager, "browser", None)
+        if pw_browser is not None and hasattr(pw_browser, "is_connected"):
+            return pw_browser.is_connected()
+        return True
+
+    async def _maintenance_loop(self):
+        while not self._closed:
+            await asyncio.sleep(60)
+
+            now = time.time()
+            expired: list[PooledBrowser] = []
+            async with self._cond:
+                keep = []
+                for browser in self._idle:
+                    if not self._is_healthy(browser) or now - browser.last_used > self.idle_timeout:
+                        expired.append(browser)
+                    else:
+                        keep.append(browser)
+                self._idle = keep
+                self._total -= len(expired)
+                self._cond.notify_all()
+
+            for browser in expired:
+                self._stats["reaped"] += 1
+                await self._destroy(browser)
+
+
+class JobProgress:
+    """Processed-bet counter for a job whose database writes are coalesced."""
+
+    def __init__(self, processed: int = 0):
+        self.processed = processed
+        self._flushed = processed
+        self._flushed_at = time.monotonic()
+
+    def add(self, count: int) -> Optional[int]:
+        """Count processed bets; returns the total when a progress write is due."""
+        self.processed += count
+        now = time.monotonic()
+        if (
+            self.processed - self._flushed >= PROGRESS_FLUSH_COUNT
+            or now - self._flushed_at >= PROGRESS_FLUSH_INTERVAL
+        ):
+            self._flushed = self.processed
+            self._flushed_at = now
+            return self.processed
+        return None
+
+
 class JobProcessor:
     """Background processor for CLV jobs."""
 
-    def __init__(self, database: Database, max_workers: int = 3):
+    def __init__(self, database: AsyncDatabase, max_workers: int = 3):
         self.db = database
         self.max_workers = max_workers
         self.current_workers = max_workers
         self.running = False
         self._lock = asyncio.Lock()
+        # All scrape calls draw from this budget, including inline small jobs
+        self._scheduler = ScrapeScheduler(max_workers)
+        self._job_slots = asyncio.Semaphore(MAX_ACTIVE_JOBS)
+        # Single-flight table: identical in-progress fetches share one future
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._stats: dict[str, int] = defaultdict(int)
+        # Full-season OddsHarvester scrapes, indexed by date and team pair
+        self._season_cache: OrderedDict[tuple, SeasonIndex] = OrderedDict()
+        # Memoised detect_league() results, shared by all jobs
+        self._league_detector = LeagueDetector(LEAGUE_DETECT_MEMO_SIZE)
+        # Decoded league datasets + match indexes, so repeat groups skip SQLite
+        self._league_cache = LeagueMemoryCache(
+            LEAGUE_MEMORY_CACHE_ENTRIES,
+            int(LEAGUE_MEMORY_CACHE_MB * 1024 * 1024),
+            LEAGUE_MEMORY_CACHE_TTL,
+        )
+        # The Odds API responses by (sport_key, regions, markets) and last seen quota
+        self._odds_api_cache: dict[tuple, tuple[float, list]] = {}
+        self._odds_api_quota: dict[str, Any] = {"remaining": None, "used": None, "updated_at": None}
+        # Warm headless browsers shared by all OddsHarvester scrapes
+        self._browser_pool = BrowserPool(
+            BROWSER_POOL_SIZE, BROWSER_MAX_SCRAPES, BROWSER_IDLE_TIMEOUT
+        )
         self._active_jobs: dict[str, dict] = {}
         self._background_tasks: set = set()
+        # In-process dispatch queue; the jobs table stays the durable record
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queued_ids: set[str] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        # Called whenever a job is queued, started or finished
+        self.on_job_change: Optional[Callable[[], None]] = None
+        # Per-job events set when results are committed (result streams wait on these)
+        self._job_watchers: dict[str, asyncio.Event] = {}
+        self._job_watcher_counts: Counter = Counter()
 
     async def start(self):
         """Start the job processor."""
         self.running = True
+        await self._recover_jobs()
+        self._browser_pool.start()
         # Start background processing loop
-        asyncio.create_task(self._process_loop())
+        self._loop_task = asyncio.create_task(self._process_loop())
         logger.info(f"Job processor started with max {self.max_workers} workers")
 
     async def stop(self):
         """Stop the job processor."""
         self.running = False
+        # Wake the dispatcher so it can exit
+        self._queue.put_nowait(None)
+        if self._loop_task:
+            await self._loop_task
         # Wait for all background tasks to complete
         if self._background_tasks:
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self._browser_pool.close()
         logger.info("Job processor stopped")
 
     def get_active_concurrency(self) -> int:
         """Get current active concurrency level."""
         return self.current_workers
 
+    def set_max_workers(self, max_workers: int):
+        """Change the scrape concurrency ceiling at runtime."""
+        self.max_workers = max(1, max_workers)
+        self._adjust_concurrency()
+
+    def get_scheduler_stats(self) -> dict:
+        """Scrape budget and job dispatch usage."""
+        return {
+            **self._scheduler.snapshot(),
+            "active_jobs": len(self._active_jobs),
+            "max_active_jobs": MAX_ACTIVE_JOBS,
+            "queued_jobs": len(self._queued_ids),
+        }
+
+    def get_metrics(self) -> dict:
+        """Processor counters for the metrics endpoint."""
+        return {
+            "scrapes": dict(self._stats),
+            "inflight": len(self._inflight),
+            "browser_pool": self._browser_pool.get_stats(),
+            "odds_api": {
+                **self._odds_api_quota,
+                "min_quota": ODDS_API_MIN_QUOTA,
+                "cached_responses": len(self._odds_api_cache),
+            },
+            "scheduler": self.get_scheduler_stats(),
+            "league_memory_cache": self._league_cache.get_stats(),
+            "league_detection": self._league_detector.get_stats(),
+            "source_mappings": source_registry.get_stats(),
+        }
+
+    def invalidate_league_detection(self):
+        """Drop memoised league detections after a mapping update."""
+        self._league_detector.invalidate()
+
+    def clear_caches(self):
+        """Forget every in-process cache: league datasets, season scrapes and
+        Odds API responses (after the SQLite cache is cleared)."""
+        self._league_cache.invalidate()
+        self._season_cache.clear()
+        self._odds_api_cache.clear()
+
     def get_recommended_concurrency(self) -> int:
         """Calculate recommended concurrency based on available RAM."""
         try:
@@ -307,111 +1236,351 @@ class JobProcessor:
                 f"Adjusting concurrency: {self.current_workers} -> {recommended}"
             )
             self.current_workers = recommended
+            self._scheduler.set_limit(recommended)
+
+    def submit(self, job_id: str):
+        """Wake the dispatcher for a newly queued job."""
+        if job_id in self._queued_ids or job_id in self._active_jobs:
+            return
+        self._queued_ids.add(job_id)
+        self._queue.put_nowait(job_id)
+        self._notify_job_change()
+
+    def _notify_job_change(self):
+        if self.on_job_change:
+            self.on_job_change()
+
+    async def submit_bets(self, job_id: str, bets: list["BetRequest"]) -> dict:
+        """Bulk-insert a job's bets, then queue the job.
+
+        The bets are committed before this returns, so a restart can always
+        recover the job. Returns add_bet_requests' {"total", "resolved"}.
+        """
+        try:
+            counts = await self.db.add_bet_requests(job_id, [bet_request_row(bet) for bet in bets])
+        except Exception as e:
+            logger.error(f"❌ Failed to store bets for job {job_id}: {e}")
+            await self.db.update_job_status(job_id, "failed", str(e))
+            self._publish_job_update(job_id)
+            raise
+        logger.info(
+            f"📥 Stored {counts['total']} bets for job {job_id} "
+            f"({counts['resolved']} answered from earlier results)"
+        )
+
+        if counts["resolved"] == counts["total"]:
+            await self.db.update_job_status(job_id, "completed")
+            self._publish_job_update(job_id)
+            self._notify_job_change()
+        else:
+            self.submit(job_id)
+        return counts
+
+    @contextmanager
+    def watching_job(self, job_id: str):
+        """Register interest in job_id for the block; yields watch() -> Event.
+
+        Call watch() before each read, then wait on the event, so no commit is
+        missed. The job's event is dropped once its last watcher leaves, so
+        finished or abandoned jobs don't keep entries around.
+        """
+        self._job_watcher_counts[job_id] += 1
+        try:
+            yield lambda: self._job_watchers.setdefault(job_id, asyncio.Event())
+        finally:
+            self._job_watcher_counts[job_id] -= 1
+            if self._job_watcher_counts[job_id] <= 0:
+                del self._job_watcher_counts[job_id]
+                self._job_watchers.pop(job_id, None)
+
+    async def wait_for_job(self, job_id: str, timeout: float) -> bool:
+        """Wait until job_id has completed or failed; False if timeout ran out first."""
+        deadline = time.monotonic() + timeout
+        with self.watching_job(job_id) as watch:
+            while True:
+                watcher = watch()
+                state = await self.db.get_job_state(job_id)
+                if state is None or state["status"] in ("completed", "failed"):
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(watcher.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return False
+
+    def _publish_job_update(self, job_id: str):
+        event = self._job_watchers.pop(job_id, None)
+        if event:
+            event.set()
+
+    async def _recover_jobs(self):
+        """Re-queue jobs left behind by a previous run (crash recovery)."""
+        interrupted = await self.db.get_jobs_by_status("processing")
+        for job in interrupted:
+            logger.warning(f"♻️ Re-queueing interrupted job {job['id']}")
+            await self.db.update_job_status(job["id"], "queued")
+
+        queued = await self.db.get_jobs_by_status("queued")
+        for job in queued:
+            self.submit(job["id"])
+
+        if queued:
+            logger.info(f"♻️ Recovered {len(queued)} queued jobs from database")
 
     async def _process_loop(self):
-        """Main processing loop."""
+        """Main dispatch loop, woken by submit() instead of polling the database."""
         while self.running:
             try:
-                # Adjust concurrency every iteration
-                self._adjust_concurrency()
+                job_id = await self._queue.get()
+                if job_id is None or not self.running:
+                    break
 
-                # Get queued jobs
-                queued_jobs = self.db.get_jobs_by_status("queued")
+                self._queued_ids.discard(job_id)
+                if job_id in self._active_jobs:
+                    continue
 
-                for job in queued_jobs:
-                    if not self.running:
-                        break
+                # Adjust concurrency before each dispatch
+                self._adjust_concurrency()
 
-                    job_id = job["id"]
-                    if job_id in self._active_jobs:
-                        continue
+                # Bound the number of jobs in flight
+                await self._job_slots.acquire()
+                if not self.running:
+                    self._job_slots.release()
+                    break
 
+                try:
                     # Mark as processing
-                    self.db.update_job_status(job_id, "processing")
+                    await self.db.update_job_status(job_id, "processing")
                     async with self._lock:
                         self._active_jobs[job_id] = {"started": time.time()}
 
                     # Create async task for job processing
                     task = asyncio.create_task(self._process_job(job_id))
-                    self._background_tasks.add(task)
-                    task.add_done_callback(self._background_tasks.discard)
-
-                # Sleep before next poll
-                await asyncio.sleep(30)
+                except BaseException:
+                    # Only the task's done callback returns the slot, so give it back here
+                    self._active_jobs.pop(job_id, None)
+                    self._job_slots.release()
+                    raise
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+                task.add_done_callback(lambda _: self._job_slots.release())
 
             except Exception as e:
                 logger.error(f"Error in process loop: {e}")
-                await asyncio.sleep(60)
 
     async def _process_job(self, job_id: str):
         """Process a single job."""
         try:
             logger.info(f"🚀 Starting _process_job for {job_id}")
             logger.info(f"Processing job {job_id}")
-            bet_requests = self.db.get_bet_requests(job_id)
+            bet_requests = await self.db.get_bet_requests(job_id)
             logger.info(f"📦 Retrieved {len(bet_requests)} bet requests from database")
 
             if not bet_requests:
                 logger.warning(f"⚠️ No bet requests found for job {job_id}")
-                self.db.update_job_status(job_id, "completed")
+                await self.db.update_job_status(job_id, "completed")
                 return
             
-            logger.info(f"🔄 About to call _group_bets with {len(bet_requests)} bets")
+            # Bets answered from the result store at ingest time are already done
+            pending = [bet for bet in bet_requests if bet.get("result_odds") is None]
+            reused = len(bet_requests) - len(pending)
+            if reused:
+                logger.info(f"♻️ {reused} bets already resolved from earlier jobs")
+
+            logger.info(f"🔄 About to call _group_bets with {len(pending)} bets")
             # Group bets by league/date for efficient scraping
-            groups = self._group_bets(bet_requests)
+            groups = self._group_bets(pending)
             logger.info(f"📊 Grouping returned {len(groups)} groups")
-            total_processed = 0
-
-            for group_key, group_bets in groups.items():
-                if not self.running:
-                    break
-
-                sport, league, event_date = group_key
-                
-                logger.info(f"🔍 Processing group: {sport}/{league} on {event_date} ({len(group_bets)} bets)")
-
-                # Check cache first
-                cached_data = self.db.get_cached_league_data(sport, league, event_date)
-
-                if not cached_data:
-                    logger.info(f"💾 No cache found, scraping {sport}/{league}...")
-                    # Scrape from OddsHarvester (now async)
-                    scraped_data = await self._scrape_league(sport, league, event_date)
-                    if scraped_data:
-                        logger.info(f"✅ Scraped {len(scraped_data.get('matches', []))} matches")
-                        self.db.cache_league_data(
-                            sport, league, event_date, scraped_data
-                        )
-                        cached_data = scraped_data
-                    else:
-                        logger.warning(f"⚠️ No data from scraping")
-                else:
-                    logger.info(f"📦 Using cached data for {sport}/{league}")
-
-                # Match bets to scraped data
-                logger.info(f"🎯 Matching {len(group_bets)} bets to odds data...")
-                for bet in group_bets:
-                    logger.info(f"   Processing: {bet.get('home_team')} vs {bet.get('away_team')}")
-                    result = self._match_bet_to_odds(bet, cached_data)
-                    logger.info(f"   Result: closingOdds={result.get('closingOdds')}, score={result.get('matchScore')}")
-                    self.db.update_bet_result(bet["id"], result)
-                    total_processed += 1
-                    self.db.update_job_progress(job_id, total_processed)
-
-            self.db.update_job_status(job_id, "completed")
+            progress = JobProgress(reused)
+
+            # Independent groups run concurrently; scrapes still draw from the global budget
+            outcomes = await asyncio.gather(
+                *(
+                    self._process_group(job_id, group_key, group_bets, progress)
+                    for group_key, group_bets in groups.items()
+                ),
+                return_exceptions=True,
+            )
+            errors = [o for o in outcomes if isinstance(o, BaseException)]
+            if errors:
+                raise errors[0]
+
+            total_processed = progress.processed
+            await self.db.update_job_progress(job_id, total_processed)
+            await self.db.update_job_status(job_id, "completed")
+            self._publish_job_update(job_id)
+            self._notify_job_change()
             logger.info(f"Job {job_id} completed: {total_processed} bets processed")
 
         except Exception as e:
             logger.error(f"❌ Error processing job {job_id}: {e}")
             logger.error(f"❌ Exception type: {type(e).__name__}")
             logger.error(f"❌ Traceback:", exc_info=True)
-            self.db.update_job_status(job_id, "failed", str(e))
-            self.db.log_failure(job_id, "processing_error", str(e))
+            await self.db.update_job_status(job_id, "failed", str(e))
+            await self.db.log_failure(job_id, "processing_error", str(e))
+            self._publish_job_update(job_id)
+            self._notify_job_change()
 
         finally:
             async with self._lock:
                 self._active_jobs.pop(job_id, None)
 
+    async def _process_group(
+        self,
+        job_id: str,
+        group_key: tuple[str, str, str],
+        group_bets: list[dict],
+        progress: JobProgress,
+    ):
+        """Fetch odds for one sport/league/date group and commit its bet results."""
+        if not self.running:
+            return
+
+        sport, league, event_date = group_key
+
+        logger.info(f"🔍 Processing group: {sport}/{league} on {event_date} ({len(group_bets)} bets)")
+
+        cached_data, index = await self._fetch_league_data(job_id, sport, league, event_date)
+
+        # Match bets to scraped data, sharing one index across the group
+        logger.info(f"🎯 Matching {len(group_bets)} bets to odds data...")
+        reusable = bool(cached_data) and cached_data.get("source") in CLOSING_ODDS_SOURCES
+        results = []
+        store = []
+        for bet in group_bets:
+            logger.info(f"   Processing: {bet.get('home_team')} vs {bet.get('away_team')}")
+            result = self._match_bet_to_odds(bet, cached_data, index)
+            logger.info(f"   Result: closingOdds={result.get('closingOdds')}, score={result.get('matchScore')}")
+            results.append((bet["id"], result))
+            if reusable and result.get("closingOdds") is not None:
+                key = result_key(bet["bet_id"], bet["market"], bet["bookmaker"], bet["event_date"])
+                store.append((key, bet["bet_id"], result))
+
+        # One transaction per group; progress rides along when it is due
+        await self.db.save_bet_results(
+            results,
+            job_id=job_id,
+            processed_bets=progress.add(len(results)),
+            store=store,
+            source_fingerprint=league_fingerprint(*group_key, cached_data) if cached_data else None,
+        )
+        self._publish_job_update(job_id)
+
+    async def _single_flight(self, key: tuple, factory):
+        """Run factory() once per key; concurrent callers await the same result."""
+        while True:
+            fut = self._inflight.get(key)
+            if fut is None:
+                break
+
+            self._stats["coalesced"] += 1
+            logger.info(f"🔗 Joining in-flight fetch for {key}")
+            try:
+                return await asyncio.shield(fut)
+            except FlightAborted:
+                # Leader was cancelled - retry, possibly becoming the leader
+                continue
+
+        fut = asyncio.get_running_loop().create_future()
+        # Mark the exception retrieved when nobody else is waiting
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = fut
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            fut.set_exception(FlightAborted(str(key)))
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch_league_data(
+        self, job_id: str, sport: str, league: str, event_date: str
+    ) -> tuple[Optional[dict], Optional[MatchIndex]]:
+        """Get league data and its index from memory, SQLite or a scrape.
+
+        Identical requests across jobs are coalesced.
+        """
+        key = ("league", sport, league, event_date)
+        cached = self._league_cache.get(key)
+        if cached:
+            # Keep the SQLite entry's last_access current, or LRU eviction
+            # would pick exactly the entries served from memory
+            self.db.db.touch_league_data(sport, league, event_date)
+            return cached
+
+        async def load() -> tuple[Optional[dict], Optional[MatchIndex]]:
+            # Check cache first
+            cached_data = await self.db.get_cached_league_data(sport, league, event_date)
+            if cached_data:
+                self._stats["cache_hits"] += 1
+                logger.info(f"📦 Using cached data for {sport}/{league}")
+                return self._league_cache.put(key, cached_data)
+
+            # Recently came back empty - don't scrape again until the entry expires
+            negative = await self.db.get_negative_entry(sport, league, event_date)
+            if negative:
+                self._stats["suppressed"] += 1
+                retry_in = negative["expires_at"] - int(time.time())
+                logger.info(
+                    f"🚫 Skipping {sport}/{league} on {event_date}: {negative['reason']} "
+                    f"({negative['failures']} failures, retry in {retry_in}s)"
+                )
+                return None, None
+
+            logger.info(f"💾 No cache found, scraping {sport}/{league}...")
+            self._stats["started"] += 1
+            # One registry lookup per group, shared by both sources and the miss classification
+            sources = source_registry.resolve(sport, league)
+            # Scrape from OddsHarvester (now async), within the global budget
+            try:
+                async with self._scheduler.slot(job_id):
+                    scraped_data = await self._scrape_league(sport, league, event_date, sources)
+            except ScrapeFailed as e:
+                # Not evidence that the league has no data: retry soon, don't escalate
+                self._stats["scrape_errors"] += 1
+                await self.db.record_negative(
+                    sport, league, event_date, "transient_error",
+                    NEGATIVE_CACHE_ERROR_TTL, NEGATIVE_CACHE_ERROR_TTL,
+                )
+                logger.warning(f"⚠️ Scrape failed ({e}); retrying after {NEGATIVE_CACHE_ERROR_TTL}s")
+                return None, None
+
+            if scraped_data:
+                logger.info(f"✅ Scraped {len(scraped_data.get('matches', []))} matches")
+                await self.db.cache_league_data(sport, league, event_date, scraped_data)
+                await self.db.clear_negative(sport, league, event_date)
+                return self._league_cache.put(key, scraped_data)
+
+            self._stats["empty"] += 1
+            reason = self._classify_scrape_miss(league, sources)
+            negative = await self.db.record_negative(
+                sport, league, event_date, reason,
+                NEGATIVE_CACHE_BASE_TTL[reason], NEGATIVE_CACHE_MAX_TTL,
+            )
+            logger.warning(
+                f"⚠️ No data from scraping ({reason}); suppressed for "
+                f"{negative['expires_at'] - negative['last_failed']}s"
+            )
+            return None, None
+
+        return await self._single_flight(key, load)
+
+    @staticmethod
+    def _classify_scrape_miss(league: str, sources: dict) -> str:
+        """Reason code for a scrape that returned nothing (sources from SourceRegistry.resolve)."""
+        if league == "unknown":
+            return "unknown_league"
+        has_source = sources["oddsharvester"] or (THE_ODDS_API_KEY and sources["odds_api"])
+        return "no_matches" if has_source else "unmapped"
+
     def _group_bets(
         self, bets: list[dict]
     ) -> dict[tuple[str, str, str], list[dict]]:
@@ -420,9 +1589,10 @@ class JobProcessor:
 
         logger.info(f"📊 Grouping {len(bets)} bets by sport/league/date...")
 
+        unknown = 0
         for bet in bets:
             # Detect league from team names
-            league_info = detect_league(
+            league_info = self._league_detector.detect(
                 bet["home_team"],
                 bet["away_team"],
                 bet.get("tournament", ""),
@@ -432,11 +1602,12 @@ class JobProcessor:
             if league_info:
                 league = league_info["league"]
                 inferred_sport = league_info.get("sport", bet["sport"])  # Use inferred sport if available
-                logger.info(f"   ✅ {bet['home_team']} vs {bet['away_team']} -> {inferred_sport}/{league}")
+                logger.debug(f"   ✅ {bet['home_team']} vs {bet['away_team']} -> {inferred_sport}/{league}")
             else:
                 league = "unknown"
                 inferred_sport = bet["sport"]
-                logger.warning(f"   ⚠️ {bet['home_team']} vs {bet['away_team']} -> UNKNOWN league")
+                unknown += 1
+                logger.debug(f"   ⚠️ {bet['home_team']} vs {bet['away_team']} -> UNKNOWN league")
 
             key = (inferred_sport, league, bet["event_date"])  # Use inferred_sport instead of bet["sport"]
 
@@ -444,33 +1615,28 @@ class JobProcessor:
                 groups[key] = []
             groups[key].append(bet)
 
+        if unknown:
+            logger.warning(f"   ⚠️ {unknown} bets with UNKNOWN league")
         logger.info(f"✅ Created {len(groups)} groups: {list(groups.keys())}")
         return groups
 
-    async def _scrape_league_with_oddsharvester(self, sport: str, league: str, event_date: str) -> Optional[dict]:
+    async def _scrape_league_with_oddsharvester(
+        self, sport: str, league: str, event_date: str, oh_params: Optional[tuple]
+    ) -> Optional[dict]:
         """
         Try to fetch odds using OddsHarvester (async).
+        oh_params is the (sport, league) pair OddsHarvester expects.
         Returns None if OddsHarvester fails or is blocked.
         """
         try:
-            # Import OddsHarvester components
-            sys.path.insert(0, str(Path(ODDS_HARVESTER_PATH) / "src"))
-            from core.odds_portal_scraper import OddsPortalScraper
-            from core.playwright_manager import PlaywrightManager
-            from core.browser_helper import BrowserHelper
-            from core.odds_portal_market_extractor import OddsPortalMarketExtractor
-            
             logger.info(f"🕷️ Attempting OddsHarvester scrape for {sport}/{league}")
             
-            # Map to OddsHarvester format
-            oh_params = map_to_oddsharvester_params(sport, league)
             if not oh_params:
                 logger.warning(f"⚠️ No OddsHarvester mapping for {sport}/{league}")
                 return None
             
             oh_sport, oh_league = oh_params
             date_obj = datetime.fromisoformat(event_date.replace("Z", "+00:00"))
-            oh_date = date_obj.strftime("%Y%m%d")
             
             # Determine season for historic scraping
             # Most football leagues run Aug-May, so season spans two years
@@ -484,26 +1650,55 @@ class JobProcessor:
                 season = f"{year-1}-{year}"
             
             logger.info(f"🔑 OddsHarvester: {oh_sport}/{oh_league} season {season}")
-            
-            # Initialize components
-            playwright_manager = PlaywrightManager()
-            browser_helper = BrowserHelper()
-            market_extractor = OddsPortalMarketExtractor(browser_helper)
-            
-            scraper = OddsPortalScraper(
-                playwright_manager=playwright_manager,
-                browser_helper=browser_helper,
-                market_extractor=market_extractor,
-                preview_submarkets_only=False
-            )
-            
-            # Start browser with timeout
-            await asyncio.wait_for(
-                scraper.start_playwright(headless=True),
-                timeout=30
-            )
-            
-            try:
+
+            # One historic scrape serves every date in the season
+            season_index = await self._get_season_index(oh_sport, oh_league, season)
+            if not season_index:
+                return None
+
+            target_date = date_obj.date()
+            matches = season_index.matches_on(target_date, event_date)
+
+            if not matches:
+                logger.warning(f"⚠️ No matches found for date {target_date} (checked {len(season_index.records)} season matches)")
+                return None
+
+            logger.info(f"✅ OddsHarvester: {len(matches)} matches for {target_date}")
+
+            return {
+                'matches': matches,
+                'sport': sport,
+                'league': league,
+                'season': season,
+                'scraped_at': season_index.scraped_at,
+                'source': 'oddsharvester'
+            }
+        
+        except asyncio.TimeoutError as e:
+            logger.warning("⏱️ OddsHarvester timeout - trying fallback")
+            raise ScrapeFailed("OddsHarvester timeout") from e
+        except ImportError as e:
+            logger.warning(f"⚠️ OddsHarvester import failed: {e}")
+            raise ScrapeFailed(f"OddsHarvester import failed: {e}") from e
+        except Exception as e:
+            logger.warning(f"⚠️ OddsHarvester error: {e}")
+            raise ScrapeFailed(f"OddsHarvester error: {e}") from e
+
+    async def _get_season_index(self, oh_sport: str, oh_league: str, season: str) -> Optional["SeasonIndex"]:
+        """Return the indexed season scrape, scraping it at most once per SEASON_CACHE_TTL."""
+        key = (oh_sport, oh_league, season)
+        season_index = self._season_cache.get(key)
+        if season_index and time.time() - season_index.created < SEASON_CACHE_TTL:
+            self._stats["season_hits"] += 1
+            self._season_cache.move_to_end(key)
+            logger.info(f"📚 Using cached season {season} for {oh_sport}/{oh_league}")
+            return season_index
+
+        async def load() -> Optional[SeasonIndex]:
+            self._stats["season_scrapes"] += 1
+
+            # Lease a warm browser from the pool
+            async with self._browser_pool.lease() as scraper:
                 # Scrape HISTORIC matches (not upcoming) to get closing odds
                 logger.info(f"🕒 Scraping historic matches for season {season}...")
                 results = await asyncio.wait_for(
@@ -518,152 +1713,104 @@ class JobProcessor:
                     ),
                     timeout=120  # 2 minute timeout per scrape
                 )
-                
-                if not results:
-                    logger.warning(f"⚠️ OddsHarvester returned no results for {season}")
-                    return None
-                
-                logger.info(f"📊 OddsHarvester found {len(results)} matches in season, filtering by date {event_date}...")
-                
-                # Filter results to only include matches from the target date
-                target_date = date_obj.date()
-                filtered_results = []
-                
-                for match_data in results:
-                    match_date_str = match_data.get('start_date', '')
-                    if match_date_str:
-                        try:
-                            # Parse match date (format varies: "2025-12-01" or "01.12.2025" or timestamp)
-                            if isinstance(match_date_str, str):
-                                if '-' in match_date_str:
-                                    match_date = datetime.fromisoformat(match_date_str.split('T')[0]).date()
-                                elif '.' in match_date_str:
-                                    # DD.MM.YYYY format
-                                    parts = match_date_str.split('.')
-                                    match_date = datetime(int(parts[2]), int(parts[1]), int(parts[0])).date()
-                                else:
-                                    continue
-                                
-                                if match_date == target_date:
-                                    filtered_results.append(match_data)
-                        except Exception as e:
-                            logger.debug(f"Failed to parse date '{match_date_str}': {e}")
-                            continue
-                
-                if not filtered_results:
-                    logger.warning(f"⚠️ No matches found for date {target_date} (checked {len(results)} season matches)")
-                    return None
-                
-                logger.info(f"✅ Found {len(filtered_results)} matches for {target_date}")
-                results = filtered_results
-                
-                # Transform to expected format
-                matches = []
-                for match_data in results:
-                    match = {
-                        'home_team': match_data.get('home_team', ''),
-                        'away_team': match_data.get('away_team', ''),
-                        'date': match_data.get('start_date', event_date),
-                        'odds': {}
-                    }
-                    
-                    markets_data = match_data.get('markets', {})
-                    for market_name, market_data in markets_data.items():
-                        if not isinstance(market_data, dict):
-                            continue
-                        
-                        formatted_market = {
-                            '1x2': '1X2',
-                            'over_under_2_5': 'Over/Under 2.5',
-                            'btts': 'Both Teams to Score'
-                        }.get(market_name, market_name)
-                        
-                        match['odds'][formatted_market] = {'bookmakers': {}}
-                        
-                        # Extract bookmaker odds from market data
-                        for key, value in market_data.items():
-                            if isinstance(value, list):
-                                for entry in value:
-                                    if isinstance(entry, dict):
-                                        bookie = entry.get('bookmaker_name', '').lower()
-                                        
-                                        # Get odds value
-                                        odds_val = None
-                                        if '1' in entry:
-                                            odds_val = float(entry['1'])
-                                        elif 'odds_over' in entry:
-                                            odds_val = float(entry['odds_over'])
-                                        else:
-                                            for k, v in entry.items():
-                                                if k not in ['bookmaker_name', 'period'] and isinstance(v, (int, float, str)):
-                                                    try:
-                                                        odds_val = float(v)
-                                                        break
-                                                    except:
-                                                        pass
-                                        
-                                        if odds_val and bookie:
-                                            match['odds'][formatted_market]['bookmakers'][bookie] = odds_val
-                    
-                    if match['odds']:
-                        matches.append(match)
-                
-                logger.info(f"✅ OddsHarvester: {len(matches)} matches scraped")
-                
-                return {
-                    'matches': matches,
-                    'sport': sport,
-                    'league': league,
-                    'season': f"{date_obj.year}-{date_obj.year + 1}",
-                    'scraped_at': datetime.now().isoformat(),
-                    'source': 'oddsharvester'
-                } if matches else None
-            
-            finally:
-                await scraper.stop_playwright()
-        
-        except asyncio.TimeoutError:
-            logger.warning("⏱️ OddsHarvester timeout - trying fallback")
-            return None
-        except ImportError as e:
-            logger.warning(f"⚠️ OddsHarvester import failed: {e}")
-            return None
-        except Exception as e:
-            logger.warning(f"⚠️ OddsHarvester error: {e}")
+
+            if not results:
+                logger.warning(f"⚠️ OddsHarvester returned no results for {season}")
+                return None
+
+            season_index = SeasonIndex(results)
+            logger.info(
+                f"📊 OddsHarvester found {len(results)} matches in season {season}, "
+                f"indexed {len(season_index.by_date)} dates"
+            )
+
+            self._season_cache[key] = season_index
+            while len(self._season_cache) > SEASON_CACHE_MAX_ENTRIES:
+                self._season_cache.popitem(last=False)
+            return season_index
+
+        return await self._single_flight(("season",) + key, load)
+
+    async def _fetch_odds_api_events(self, sport_key: str, regions: str, markets: str) -> Optional[list]:
+        """Get /odds events for a sport key, from the TTL cache when possible."""
+        key = (sport_key, regions, markets)
+        cached = self._odds_api_cache.get(key)
+        if cached and time.time() - cached[0] < ODDS_API_CACHE_TTL:
+            self._stats["odds_api_hits"] += 1
+            logger.info(f"📦 Using cached The Odds API response for {sport_key}")
+            return cached[1]
+
+        remaining = self._odds_api_quota["remaining"]
+        if remaining is not None and remaining < ODDS_API_MIN_QUOTA:
+            self._stats["odds_api_refused"] += 1
+            logger.warning(f"⚠️ The Odds API quota low ({remaining} < {ODDS_API_MIN_QUOTA}), skipping {sport_key}")
             return None
 
-    async def _scrape_with_odds_api(self, sport: str, league: str, event_date: str) -> Optional[dict]:
+        async def load() -> list:
+            logger.info(f"🌐 Fetching from The Odds API: {sport_key}")
+            self._stats["odds_api_requests"] += 1
+
+            url = f"https://api.the-odds-api.com/v4/sports/{sport_key}/odds"
+            params = {
+                'apiKey': THE_ODDS_API_KEY,
+                'regions': regions,
+                'markets': markets,
+                'oddsFormat': 'decimal',
+                'dateFormat': 'iso'
+            }
+
+            # Shared keep-alive client instead of a new connection pool per call
+            response = await http_get(url, params)
+            self._record_odds_api_quota(response.headers)
+
+            response.raise_for_status()
+            events = response.json()
+
+            now = time.time()
+            for stale in [k for k, (ts, _) in self._odds_api_cache.items() if now - ts >= ODDS_API_CACHE_TTL]:
+                del self._odds_api_cache[stale]
+            self._odds_api_cache[key] = (now, events)
+            return events
+
+        return await self._single_flight(("odds_api",) + key, load)
+
+    def _record_odds_api_quota(self, headers: httpx.Headers):
+        """Remember the quota headers from the latest The Odds API response."""
+        remaining = headers.get('x-requests-remaining')
+        used = headers.get('x-requests-used')
+        logger.info(f"📊 API Quota: {remaining or 'unknown'} remaining")
+
+        if remaining is not None:
+            try:
+                self._odds_api_quota["remaining"] = int(float(remaining))
+            except ValueError:
+                pass
+        if used is not None:
+            try:
+                self._odds_api_quota["used"] = int(float(used))
+            except ValueError:
+                pass
+        self._odds_api_quota["updated_at"] = datetime.now().isoformat()
+
+    async def _scrape_with_odds_api(
+        self, sport: str, league: str, event_date: str, sport_key: Optional[str]
+    ) -> Optional[dict]:
         """Fallback: Fetch odds from The Odds API (async to avoid blocking event loop)."""
         try:
             if not THE_ODDS_API_KEY:
                 logger.warning("⚠️ THE_ODDS_API_KEY not configured")
                 return None
             
-            sport_key = map_to_odds_api_sport(sport, league)
             if not sport_key:
                 logger.warning(f"⚠️ No API mapping for {sport}/{league}")
                 return None
             
-            logger.info(f"🌐 Fetching from The Odds API: {sport_key}")
-            
-            url = f"https://api.the-odds-api.com/v4/sports/{sport_key}/odds"
-            params = {
-                'apiKey': THE_ODDS_API_KEY,
-                'regions': 'us,uk,eu',
-                'markets': 'h2h,spreads,totals',
-                'oddsFormat': 'decimal',
-                'dateFormat': 'iso'
-            }
-            
-            # Use async httpx instead of blocking requests
-            import httpx
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(url, params=params)
-                remaining = response.headers.get('x-requests-remaining', 'unknown')
-                logger.info(f"📊 API Quota: {remaining} remaining")
-                
-                response.raise_for_status()
-                events = response.json()
+            # Raw response is cached per sport key and reused across dates and jobs
+            events = await self._fetch_odds_api_events(
+                sport_key, ODDS_API_REGIONS, ODDS_API_MARKETS
+            )
+            if events is None:
+                raise ScrapeFailed(f"The Odds API quota too low for {sport_key}")
             
             if not events:
                 return None
@@ -723,16 +1870,21 @@ class JobProcessor:
                 'source': 'the_odds_api'
             } if matches else None
         
+        except ScrapeFailed:
+            raise
         except Exception as e:
             logger.error(f"❌ The Odds API error: {e}")
-            return None
+            raise ScrapeFailed(f"The Odds API error: {e}") from e
 
-    async def _scrape_league(self, sport: str, league: str, event_date: str) -> Optional[dict]:
+    async def _scrape_league(self, sport: str, league: str, event_date: str, sources: dict) -> Optional[dict]:
         """
         Try to fetch odds using OddsHarvester first, fallback to The Odds API.
-        Returns scraped data or None if both fail.
+        sources is the group's SourceRegistry.resolve() result.
+        Returns scraped data, or None if neither source has matches. Raises
+        ScrapeFailed if nothing was found and at least one source errored.
         """
         logger.info(f"🌐 Fetching odds for {sport}/{league} on {event_date}")
+        errors = []
         
         # Skip OddsHarvester if league is unknown (it will error out)
         if league == "unknown":
@@ -740,7 +1892,9 @@ class JobProcessor:
         else:
             # Strategy 1: Try OddsHarvester (free, unlimited)
             try:
-                result = await self._scrape_league_with_oddsharvester(sport, league, event_date)
+                result = await self._scrape_league_with_oddsharvester(
+                    sport, league, event_date, sources["oddsharvester"]
+                )
                 
                 if result:
                     logger.info(f"✅ OddsHarvester succeeded for {sport}/{league}")
@@ -748,23 +1902,27 @@ class JobProcessor:
                     
             except Exception as e:
                 logger.warning(f"⚠️ OddsHarvester failed: {e}")
+                errors.append(str(e))
         
         # Strategy 2: Fallback to The Odds API (reliable, quota-limited)
         logger.info(f"🔄 Falling back to The Odds API...")
         try:
-            result = await self._scrape_with_odds_api(sport, league, event_date)
+            result = await self._scrape_with_odds_api(sport, league, event_date, sources["odds_api"])
             if result:
                 logger.info(f"✅ The Odds API succeeded for {sport}/{league}")
                 return result
         except Exception as e:
             logger.warning(f"⚠️ The Odds API failed: {e}")
+            errors.append(str(e))
         
         # Strategy 3: Both failed
         logger.error(f"❌ Both OddsHarvester and The Odds API failed for {sport}/{league}")
+        if errors:
+            raise ScrapeFailed("; ".join(errors))
         return None
     
     def _match_bet_to_odds(
-        self, bet: dict, scraped_data: Optional[dict]
+        self, bet: dict, scraped_data: Optional[dict], index: Optional[MatchIndex] = None
     ) -> dict:
         """Match a bet to closing odds from scraped data."""
         result = {
@@ -783,25 +1941,11 @@ class JobProcessor:
         away_normalized = normalize_team_name(bet["away_team"])
         target_bookmaker = normalize_bookmaker(bet["bookmaker"])
 
-        matches = scraped_data.get("matches", [])
+        if index is None:
+            index = MatchIndex(scraped_data.get("matches", []))
 
         # Find matching event
-        best_match = None
-        best_score = 0.0
-
-        for match in matches:
-            match_home = normalize_team_name(match.get("home_team", ""))
-            match_away = normalize_team_name(match.get("away_team", ""))
-
-            # Calculate match score
-            home_result = find_best_match(home_normalized, [match_home])
-            away_result = find_best_match(away_normalized, [match_away])
-
-            if home_result and away_result:
-                score = (home_result["score"] + away_result["score"]) / 2
-                if score > best_score:
-                    best_score = score
-                    best_match = match
+        best_match, best_score = index.best_match(home_normalized, away_normalized)
 
         if not best_match or best_score < 0.5:  # Lowered from 0.75 for testing
             logger.warning(f"❌ No match found for {bet['home_team']} vs {bet['away_team']} (best score: {best_score:.2f})")
@@ -868,13 +2012,124 @@ class JobProcessor:
         return result
 
 
+# === Health Snapshot ===
+
+
+class HealthMonitor:
+    """Precomputed /health snapshot.
+
+    Refreshed in the background every HEALTH_REFRESH_INTERVAL seconds and soon
+    after job events, so /health never forks git or queries SQLite itself.
+    """
+
+    def __init__(self, database: AsyncDatabase, interval: float = HEALTH_REFRESH_INTERVAL):
+        self.db = database
+        self.interval = interval
+        self._snapshot: Optional[dict] = None
+        self._refreshed_at = 0.0
+        self._version: Optional[str] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background refresh loop."""
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Stop the background refresh loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def notify(self):
+        """Request a refresh soon (job queued/started/finished, cache cleared...)."""
+        self._wake.set()
+
+    def invalidate_version(self):
+        """Re-read the OddsHarvester commit on the next refresh."""
+        self._version = None
+        self.notify()
+
+    def get_snapshot(self) -> Optional[dict]:
+        """Latest snapshot with its age in seconds, or None before the first refresh."""
+        if self._snapshot is None:
+            return None
+        return {
+            **self._snapshot,
+            "snapshot_age": round(time.time() - self._refreshed_at, 3),
+        }
+
+    async def refresh(self):
+        """Recompute the snapshot off the event loop."""
+        loop = asyncio.get_running_loop()
+        if self._version is None:
+            self._version = await loop.run_in_executor(None, get_odds_harvester_version)
+
+        values = await self.db.read(self._collect, self.db.db)
+
+        oldest_timestamp = values["cache_stats"].get("oldest_timestamp")
+        cache_age = None
+        if oldest_timestamp:
+            cache_age = int(
+                (datetime.now() - datetime.fromisoformat(oldest_timestamp)).total_seconds()
+                / 86400
+            )
+
+        self._snapshot = {
+            "status": "ok",
+            "version": "1.0.0",
+            "odds_harvester_version": self._version,
+            "db_size": values["db_size"],
+            "cache_age": cache_age,
+            "pending_jobs": values["pending_jobs"],
+            "failure_rate": values["failure_rate"],
+            "recommended_concurrency": values["recommended_concurrency"],
+            "health_state": values["health_state"],
+        }
+        self._refreshed_at = time.time()
+
+    @staticmethod
+    def _collect(database: CacheDatabase) -> dict:
+        """Blocking part of a refresh; runs on a database reader thread."""
+        failure_rate = get_failure_rate(database)
+        return {
+            "pending_jobs": database.count_pending_jobs(),
+            "cache_stats": get_cache_stats(database),
+            "db_size": get_db_size(database),
+            "failure_rate": failure_rate,
+            "health_state": calculate_health_state(failure_rate),
+            "recommended_concurrency": (
+                job_processor.get_recommended_concurrency() if job_processor else MAX_CONCURRENCY
+            ),
+        }
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Health snapshot refresh failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            # Coalesce bursts of job events into one refresh
+            await asyncio.sleep(HEALTH_MIN_REFRESH_INTERVAL)
+
+
 # === Lifespan Management ===
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan."""
-    global db, job_processor, scheduler
+    global db, async_db, job_processor, scheduler, http_client, health_monitor
 
     # Startup
     logger.info("Starting OddsHarvester API server...")
@@ -893,22 +2148,38 @@ async def lifespan(app: FastAPI):
         logger.warning(f"   Alternative: Set environment variable $env:THE_ODDS_API_KEY='your_key'")
 
     # Initialize database
-    db_path = Path(__file__).parent / "clv_cache.db"
-    db = Database(str(db_path))
+    db_path = Path(CACHE_DB_PATH)
+    db = CacheDatabase(str(db_path))
+    async_db = AsyncDatabase(db, readers=DB_READER_THREADS)
     logger.info(f"Database initialized at {db_path}")
 
+    # Shared outbound HTTP client
+    http_client = create_http_client()
+
     # Start job processor
-    job_processor = JobProcessor(db, max_workers=MAX_CONCURRENCY)
+    job_processor = JobProcessor(async_db, max_workers=MAX_CONCURRENCY)
+    health_monitor = HealthMonitor(async_db)
+    job_processor.on_job_change = health_monitor.notify
     await job_processor.start()
+    health_monitor.start()
 
     # Start scheduler for cleanup
+    loop = asyncio.get_running_loop()
     scheduler = BackgroundScheduler()
     scheduler.add_job(
-        lambda: cleanup_old_cache(db, CACHE_RETENTION_DAYS),
+        lambda: asyncio.run_coroutine_threadsafe(run_cache_eviction(CACHE_RETENTION_DAYS), loop).result(),
         "interval",
         hours=24,
         id="cache_cleanup",
     )
+    # Recounts go through the writer thread like every other write, so they
+    # queue behind job commits instead of holding the write lock against them
+    scheduler.add_job(
+        lambda: asyncio.run_coroutine_threadsafe(async_db.write(db.refresh_cache_stats), loop).result(),
+        "interval",
+        hours=24,
+        id="cache_stats_refresh",
+    )
     scheduler.add_job(
         lambda: run_health_check(),
         "interval",
@@ -942,17 +2213,23 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.info(f"ℹ️  Could not check for updates (offline or rate limited): {str(e)[:50]}")
 
-    # Run initial health check
-    run_health_check()
+    # Run initial health check (subprocess + metadata writes) off the event loop
+    await asyncio.get_running_loop().run_in_executor(None, run_health_check)
 
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+    if health_monitor:
+        await health_monitor.stop()
     if job_processor:
         await job_processor.stop()
     if scheduler:
         scheduler.shutdown()
+    if http_client:
+        await http_client.aclose()
+    if async_db:
+        async_db.close()
     if db:
         db.close()
 
@@ -1060,12 +2337,13 @@ def run_health_check():
             db.set_metadata("health_status", "critical")
 
 
-def calculate_health_state() -> str:
+def calculate_health_state(failure_rate: Optional[float] = None) -> str:
     """Calculate overall health state."""
     if not db:
         return "unknown"
 
-    failure_rate = get_failure_rate(db)
+    if failure_rate is None:
+        failure_rate = get_failure_rate(db)
     health_status = db.get_metadata("health_status") or "unknown"
 
     if health_status == "critical" or failure_rate > 0.5:
@@ -1076,28 +2354,37 @@ def calculate_health_state() -> str:
         return "healthy"
 
 
-def get_cache_stats(db: Database) -> dict:
-    """Get cache statistics."""
-    conn = db._get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM closing_odds_cache")
-    total_odds = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM league_cache")
-    total_leagues = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT MIN(scraped_at) FROM closing_odds_cache")
-    oldest = cursor.fetchone()[0]
-    
-    # Convert Unix timestamp to ISO format if exists
-    if oldest:
-        oldest = datetime.fromtimestamp(oldest).isoformat()
+async def run_cache_eviction(retention_days: int) -> dict:
+    """Evict expired cache rows (and LRU leagues over CACHE_MAX_MB) in small batches."""
+    max_bytes = int(CACHE_MAX_MB * 1024 * 1024) if CACHE_MAX_MB > 0 else None
+    start = time.time()
+    deleted = await async_db.evict_cache(
+        retention_days, max_bytes=max_bytes, batch_size=EVICTION_BATCH_SIZE
+    )
+    logger.info(
+        f"🧹 Cache eviction: {deleted['leagues']} leagues, {deleted['odds']} odds, "
+        f"{deleted['freed_mb']} MB freed in {time.time() - start:.1f}s"
+    )
+    return deleted
+
+
+def get_cache_stats(db: CacheDatabase) -> dict:
+    """Get cache statistics from the trigger-maintained cache_stats table."""
+    stats = db.get_cache_stats()
+    odds = stats.get("closing_odds_cache", {})
+    leagues = stats.get("league_cache", {})
+    league_entries = stats.get("league_cache_entries", {})
+
+    # Convert Unix timestamps to ISO format if they exist
+    oldest = odds.get("oldest")
+    newest = odds.get("newest")
     
     return {
-        "total_odds": total_odds,
-        "total_leagues": total_leagues,
-        "oldest_timestamp": oldest
+        "total_odds": odds.get("rows", 0),
+        "total_leagues": leagues.get("rows", 0) + league_entries.get("rows", 0),
+        "oldest_timestamp": datetime.fromtimestamp(oldest).isoformat() if oldest else None,
+        "newest_timestamp": datetime.fromtimestamp(newest).isoformat() if newest else None,
+        "total_bytes": stats["database"]["bytes"],
     }
 
 
@@ -1155,177 +2442,346 @@ app.add_middleware(
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Get server health status."""
-    global db, job_processor
+    """Get the precomputed server health snapshot."""
+    global async_db, job_processor, health_monitor
 
-    if not db:
+    if not async_db or not health_monitor:
         raise HTTPException(status_code=503, detail="Database not initialized")
 
-    pending_jobs = len(db.get_jobs_by_status("queued")) + len(
-        db.get_jobs_by_status("processing")
-    )
-
-    cache_stats = get_cache_stats(db)
-    oldest_timestamp = cache_stats.get("oldest_timestamp")
-    cache_age = None
-    if oldest_timestamp:
-        cache_age = int(
-            (datetime.now() - datetime.fromisoformat(oldest_timestamp)).total_seconds()
-            / 86400
-        )
+    snapshot = health_monitor.get_snapshot()
+    if snapshot is None:
+        await health_monitor.refresh()
+        snapshot = health_monitor.get_snapshot()
 
     return HealthResponse(
-        status="ok",
-        version="1.0.0",
-        odds_harvester_version=get_odds_harvester_version(),
-        db_size=get_db_size(db),
-        cache_age=cache_age,
-        pending_jobs=pending_jobs,
-        failure_rate=get_failure_rate(db),
+        **snapshot,
         active_concurrency=job_processor.get_active_concurrency() if job_processor else 0,
-        recommended_concurrency=job_processor.get_recommended_concurrency() if job_processor else MAX_CONCURRENCY,
-        health_state=calculate_health_state(),
     )
 
 
 @app.post("/api/batch-closing-odds")
-async def create_batch_job(request: BatchRequest):
-    """Create a batch job for CLV lookup and return results immediately for small batches."""
-    global db, job_processor
-
-    if not db:
+async def create_batch_job(request: BatchRequest, wait: Optional[float] = None):
+    """Create a batch job for CLV lookup.
+
+    Small batches (<= 20 bets) wait up to `wait` seconds (default
+    SMALL_BATCH_WAIT) for results and return whatever is ready by then:
+    bets answered from earlier jobs or cached leagues come back at once.
+    Anything still pending is reported with the job id and the last result
+    seq, to be picked up from /api/job-status/{job_id}/stream?since=<seq>
+    or /api/job-status/{job_id}?since=<seq>. The job itself runs through
+    the dispatcher like any other, so it respects the concurrency limits.
+    """
+    global async_db, job_processor
+
+    if not async_db or not job_processor:
         raise HTTPException(status_code=503, detail="Database not initialized")
 
     job_id = str(uuid.uuid4())
-
-    # Create job record
-    db.create_job(job_id, len(request.bets))
-
-    # Create bet request records
-    for bet in request.bets:
-        db.create_bet_request(
-            job_id=job_id,
-            bet_id=bet.betId,
-            sport=bet.sport,
-            tournament=bet.tournament or "",
-            home_team=bet.homeTeam,
-            away_team=bet.awayTeam,
-            market=bet.market,
-            event_date=bet.eventDate,
-            bookmaker=bet.bookmaker,
-        )
+    await async_db.create_job(job_id, len(request.bets))
 
     logger.info(f"Created job {job_id} with {len(request.bets)} bets")
 
-    # For small batches (<= 20 bets), process immediately and return results
-    # This provides synchronous response for browser extension compatibility
-    if len(request.bets) <= 20:
-        logger.info(f"Processing job {job_id} synchronously (small batch)")
-        
-        # Call the actual job processing logic (includes grouping, scraping, matching)
-        await job_processor._process_job(job_id)
-        
-        # Retrieve results from database
-        bet_requests = db.get_bet_requests(job_id)
-        results = []
-        
-        for bet_req in bet_requests:
-            results.append({
-                "bet_id": bet_req["bet_id"],
-                "success": bet_req.get("result_odds") is not None,
-                "error": bet_req.get("error"),
-                "closing_odds": bet_req.get("result_odds"),
-                "match_score": bet_req.get("match_score"),
-                "bookmaker_used": bet_req.get("result_bookmaker"),
-                "fallback_type": bet_req.get("fallback_type"),
-                "confidence": bet_req.get("confidence")
-            })
-        
-        # Job status already updated by _process_job
-        job_status = db.get_job(job_id)
-        
+    # Store the bets, then queue the job (or complete it from stored results)
+    try:
+        counts = await job_processor.submit_bets(job_id, request.bets)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to store bets: {e}")
+    total_bets = counts["total"]
+
+    # For large batches, return job ID for async polling
+    if len(request.bets) > 20:
         return {
             "job_id": job_id,
-            "total_bets": len(request.bets),
-            "status": "completed",
-            "processed": len(results),
-            "failed": len([r for r in results if not r.get("success")]),
-            "results": results
+            "total_bets": total_bets,
+            "status": "completed" if counts["resolved"] == total_bets else "queued",
+            "message": "Job queued for processing. Use /api/job-status/{job_id} to check progress."
         }
-    
-    # For large batches, return job ID for async polling
-    return {
+
+    # Small batches: answer what we can within the client's deadline
+    timeout = min(max(wait if wait is not None else SMALL_BATCH_WAIT, 0.0), SMALL_BATCH_MAX_WAIT)
+    if counts["resolved"] < total_bets and timeout > 0:
+        logger.info(f"Waiting up to {timeout:.1f}s for small batch {job_id}")
+        await job_processor.wait_for_job(job_id, timeout)
+
+    state = await async_db.get_job_state(job_id)
+    rows = await async_db.get_bet_results_since(job_id, 0, total_bets)
+    results = [format_bet_result(row) for row in rows]
+    pending = total_bets - len(results)
+
+    response = {
         "job_id": job_id,
-        "total_bets": len(request.bets),
-        "status": "queued",
-        "message": "Job queued for processing. Use /api/job-status/{job_id} to check progress."
+        "total_bets": total_bets,
+        "status": state["status"],
+        "processed": len(results),
+        "failed": len([r for r in results if not r.get("success")]),
+        "results": results,
     }
+    if pending:
+        response["pending"] = pending
+        response["seq"] = rows[-1]["result_seq"] if rows else 0
+        response["message"] = (
+            f"{pending} bets still processing. Use /api/job-status/{job_id}/stream?since={response['seq']} "
+            "or /api/job-status/{job_id} to collect them."
+        )
+    return response
 
 
-@app.get("/api/job-status/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
-    """Get status of a batch job."""
-    global db
+@app.get("/api/metrics")
+async def get_metrics():
+    """Get job processor counters (scrape coalescing, concurrency budget)."""
+    global job_processor
 
-    if not db:
+    if not job_processor:
+        raise HTTPException(status_code=503, detail="Job processor not initialized")
+
+    return job_processor.get_metrics()
+
+
+@app.post("/api/concurrency")
+async def set_concurrency(max_workers: int):
+    """Change the global scrape concurrency budget."""
+    global job_processor
+
+    if not job_processor:
+        raise HTTPException(status_code=503, detail="Job processor not initialized")
+    if max_workers < 1:
+        raise HTTPException(status_code=400, detail="max_workers must be >= 1")
+
+    job_processor.set_max_workers(max_workers)
+
+    return {
+        "success": True,
+        **job_processor.get_scheduler_stats(),
+    }
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists etag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+@app.get("/api/job-status/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str,
+    request: Request,
+    response: Response,
+    since: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """Get status of a batch job.
+
+    Without parameters, returns every result (as before). With since, cursor
+    or limit, returns only results committed after sequence number `since`
+    (or after a previous page's next_cursor), at most `limit` of them, each
+    with its "seq". Responses carry an ETag, and If-None-Match gets a 304
+    while the job is unchanged.
+    """
+    global async_db
+
+    if not async_db:
         raise HTTPException(status_code=503, detail="Database not initialized")
 
-    job = db.get_job(job_id)
+    job = await async_db.get_job_state(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    bet_results = db.get_bet_results(job_id)
+    windowed = since is not None or cursor is not None or limit is not None
+    if cursor is not None:
+        if not cursor.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = int(cursor)
+    else:
+        after = max(since or 0, 0)
+    page_size = max(1, min(limit or JOB_STATUS_PAGE_SIZE, JOB_STATUS_MAX_PAGE_SIZE))
+
+    # The requested window is part of the validator: a different page of an
+    # unchanged job is a different representation
+    window = f"{after}+{page_size}" if windowed else "all"
+    etag = f'W/"{job["result_seq"]}-{job["processed_bets"]}-{job["status"]}-{window}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    progress = {
+        "current": job["processed_bets"],
+        "total": job["total_bets"],
+    }
+
+    if not windowed:
+        bet_results = await async_db.get_bet_results(job_id)
+        return JobStatusResponse(
+            job_id=job_id,
+            status=job["status"],
+            progress=progress,
+            results=bet_results,
+            error=job.get("error_log"),
+        )
+
+    rows = await async_db.get_bet_results_since(job_id, after, page_size + 1)
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    last_seq = rows[-1]["result_seq"] if rows else after
 
     return JobStatusResponse(
         job_id=job_id,
         status=job["status"],
-        progress={
-            "current": job["processed_bets"],
-            "total": job["total_bets"],
-        },
-        results=bet_results,
+        progress=progress,
+        results=[{"seq": row["result_seq"], **format_bet_result(row)} for row in rows],
         error=job.get("error_log"),
+        seq=last_seq,
+        next_cursor=str(last_seq) if has_more else None,
+        has_more=has_more,
+    )
+
+
+@app.get("/api/job-status/{job_id}/stream")
+async def stream_job_results(
+    job_id: str, request: Request, since: int = 0, format: Optional[str] = None
+):
+    """Stream bet results as they are committed, as NDJSON (default) or Server-Sent Events.
+
+    Every result carries its sequence number ("seq", also the SSE event id).
+    A client resumes by reconnecting with since=<last seq>, or for SSE
+    with the Last-Event-ID header. The stream ends with an "end" event once
+    the job is finished and every result has been sent.
+    """
+    global async_db, job_processor
+
+    if not async_db or not job_processor:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+
+    job = await async_db.get_job_state(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    use_sse = format == "sse" or (
+        format is None and "text/event-stream" in request.headers.get("accept", "")
+    )
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    def encode(event: str, payload: dict, seq: Optional[int] = None) -> str:
+        if use_sse:
+            event_id = f"id: {seq}\n" if seq is not None else ""
+            return f"{event_id}event: {event}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps({"event": event, **payload}) + "\n"
+
+    async def events():
+        after = since
+        with job_processor.watching_job(job_id) as watch:
+            while True:
+                watcher = watch()
+                rows = await async_db.get_bet_results_since(job_id, after, STREAM_BATCH_SIZE)
+                for row in rows:
+                    after = row["result_seq"]
+                    yield encode("result", {"seq": after, **format_bet_result(row)}, after)
+                if len(rows) == STREAM_BATCH_SIZE:
+                    continue
+
+                state = await async_db.get_job_state(job_id)
+                if state is None or (state["status"] in ("completed", "failed") and after >= state["result_seq"]):
+                    yield encode("end", {
+                        "seq": after,
+                        "status": state["status"] if state else "deleted",
+                        "progress": {
+                            "current": state["processed_bets"] if state else 0,
+                            "total": state["total_bets"] if state else 0,
+                        },
+                        "error": state.get("error_log") if state else None,
+                    })
+                    return
+
+                if await request.is_disconnected():
+                    return
+                if rows:
+                    continue
+                try:
+                    await asyncio.wait_for(watcher.wait(), timeout=STREAM_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n" if use_sse else encode("heartbeat", {"seq": after})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.delete("/api/clear-cache")
 async def clear_cache(retention_days: int = 0):
     """Clear cached data."""
-    global db
+    global db, async_db
 
-    if not db:
+    if not async_db:
         raise HTTPException(status_code=503, detail="Database not initialized")
 
-    deleted = cleanup_old_cache(db, retention_days)
+    deleted = await run_cache_eviction(retention_days)
+    if job_processor:
+        job_processor.clear_caches()
+    if health_monitor:
+        health_monitor.notify()
 
     return {
         "success": True,
         "deleted_leagues": deleted.get("leagues", 0),
         "deleted_odds": deleted.get("odds", 0),
+        "deleted_negative": deleted.get("negative", 0),
         "freed_space_mb": deleted.get("freed_mb", 0),
-        "new_size_mb": get_db_size(db),
+        "new_size_mb": await async_db.read(get_db_size, db),
     }
 
 
 @app.get("/api/cache-stats", response_model=CacheStatsResponse)
 async def get_cache_statistics():
     """Get cache statistics."""
-    global db
+    global db, async_db
 
-    if not db:
+    if not async_db:
         raise HTTPException(status_code=503, detail="Database not initialized")
 
-    stats = get_cache_stats(db)
+    stats = await async_db.read(get_cache_stats, db)
 
     return CacheStatsResponse(
-        total_size_mb=get_db_size(db),
+        total_size_mb=await async_db.read(get_db_size, db),
         league_cache_count=stats.get("total_leagues", 0),
         odds_cache_count=stats.get("total_odds", 0),
         oldest_entry=stats.get("oldest_timestamp"),
-        newest_entry=stats.get("oldest_timestamp"),  # Only have oldest in current implementation
+        newest_entry=stats.get("newest_timestamp"),
     )
 
 
+@app.get("/api/negative-cache")
+async def get_negative_cache():
+    """List sport/league/date groups whose scrapes are currently suppressed."""
+    global async_db
+
+    if not async_db:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+
+    now = int(time.time())
+    entries = await async_db.get_negative_entries()
+    return {
+        "count": len(entries),
+        "groups": [
+            {
+                **entry,
+                "first_failed": datetime.fromtimestamp(entry["first_failed"]).isoformat(),
+                "last_failed": datetime.fromtimestamp(entry["last_failed"]).isoformat(),
+                "expires_at": datetime.fromtimestamp(entry["expires_at"]).isoformat(),
+                "retry_in": entry["expires_at"] - now,
+            }
+            for entry in entries
+        ],
+    }
+
+
 @app.get("/api/check-updates", response_model=UpdateCheckResponse)
 async def check_for_updates():
     """Check for OddsHarvester updates."""
@@ -1373,7 +2829,10 @@ async def update_harvester():
         
         if result.returncode != 0:
             raise Exception(result.stderr)
-            
+
+        if health_monitor:
+            health_monitor.invalidate_version()
+
         return {"success": True, "output": result.stdout}
         
     except Exception as e:
@@ -1388,8 +2847,18 @@ async def get_mappings():
 @app.post("/api/league-mappings")
 async def update_mappings(mappings: dict):
     """Update custom league mappings."""
+    global async_db, job_processor
+
     update_custom_mappings(mappings)
-    return {"success": True}
+
+    # Detections and "no mapping" suppressions made under the old mappings are stale
+    if job_processor:
+        job_processor.invalidate_league_detection()
+    cleared = 0
+    if async_db:
+        cleared = await async_db.clear_negative_reasons(["unknown_league", "unmapped"])
+
+    return {"success": True, "cleared_negative": cleared}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,169 @@
+"""CacheDatabase: migrations and the cache, job and result-store write paths."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from conftest import BET, LEAGUE_DATA, bet_rows, require_modules
+
+require_modules("database")
+
+import cache_database  # noqa: E402
+from cache_database import MIGRATIONS, AsyncDatabase, CacheDatabase, league_fingerprint, result_key  # noqa: E402
+
+
+RESULT = {
+    "closingOdds": 2.1,
+    "bookmakerUsed": "Pinnacle",
+    "fallbackType": "pinnacle",
+    "confidence": 0.85,
+    "matchScore": 1.0,
+}
+
+
+def user_version(database: CacheDatabase) -> int:
+    return database._get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_migrations_record_schema_version(tmp_path):
+    path = str(tmp_path / "cache.db")
+    CacheDatabase(path).close()
+
+    database = CacheDatabase(path)
+    assert user_version(database) == len(MIGRATIONS)
+    assert database.migrate() == len(MIGRATIONS)
+    database.close()
+
+
+def test_failed_migration_leaves_nothing_applied(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    create = "CREATE TABLE migration_probe (id INTEGER)"
+
+    monkeypatch.setattr(cache_database, "MIGRATIONS", MIGRATIONS + [[create, "NOT SQL"]])
+    with pytest.raises(sqlite3.OperationalError):
+        CacheDatabase(path)
+
+    # Re-running the migration must not trip over a half-applied CREATE TABLE
+    monkeypatch.setattr(cache_database, "MIGRATIONS", MIGRATIONS + [[create]])
+    database = CacheDatabase(path)
+    assert user_version(database) == len(MIGRATIONS) + 1
+    database.close()
+
+
+def test_refresh_cache_stats_repairs_drift(cache_db):
+    cache_db.cache_league_data("football", "epl", "2025-12-01", LEAGUE_DATA)
+    expected = cache_db.get_cache_stats()["league_cache_entries"]
+    with cache_db._transaction() as conn:
+        conn.execute("UPDATE cache_stats SET row_count = 99, total_bytes = 0")
+
+    cache_db.refresh_cache_stats()
+
+    assert cache_db.get_cache_stats()["league_cache_entries"] == expected
+
+
+def test_cached_league_decodes_odds_only_when_read(cache_db):
+    cache_db.cache_league_data("football", "epl", "2025-12-01", LEAGUE_DATA)
+
+    loaded = cache_db.get_cached_league_data("football", "epl", "2025-12-01")
+    match = loaded["matches"][0]
+
+    assert loaded["source"] == "oddsharvester"
+    assert (match["home_team"], match["away_team"]) == ("Arsenal", "Chelsea")
+    assert not match.decoded
+    assert dict(match) == LEAGUE_DATA["matches"][0]
+    assert match.decoded
+
+
+def test_new_database_uses_incremental_vacuum(tmp_path):
+    database = CacheDatabase(str(tmp_path / "cache.db"))
+    assert database.has_incremental_vacuum()
+    database.close()
+
+
+def test_eviction_removes_expired_rows(cache_db):
+    cache_db.cache_league_data("football", "epl", "2025-12-01", LEAGUE_DATA)
+    async_db = AsyncDatabase(cache_db)
+
+    async def evict(retention_days: int) -> dict:
+        return await async_db.evict_cache(retention_days)
+
+    assert asyncio.run(evict(30))["leagues"] == 0
+    assert cache_db.get_cached_league_data("football", "epl", "2025-12-01") is not None
+
+    deleted = asyncio.run(evict(0))
+    async_db.close()
+    assert deleted["leagues"] == 1
+    assert cache_db.get_cached_league_data("football", "epl", "2025-12-01") is None
+    assert cache_db.get_cache_stats()["league_cache_entries"]["rows"] == 0
+
+
+def test_negative_ttl_doubles_up_to_max_and_resets_on_new_reason(cache_db):
+    def ttl(reason: str) -> int:
+        entry = cache_db.record_negative("football", "epl", "2025-12-01", reason, 100, 350)
+        return entry["expires_at"] - entry["last_failed"]
+
+    assert [ttl("no_matches") for _ in range(4)] == [100, 200, 350, 350]
+    assert ttl("transient_error") == 100
+
+    cache_db.clear_negative("football", "epl", "2025-12-01")
+    assert cache_db.get_negative_entry("football", "epl", "2025-12-01") is None
+
+
+def test_results_are_returned_in_commit_order(cache_db):
+    cache_db.create_job("job", 3)
+    cache_db.add_bet_requests("job", bet_rows("a", "b", "c"))
+    rows = {row["bet_id"]: row["id"] for row in cache_db.get_bet_requests("job")}
+
+    cache_db.save_bet_results([(rows["c"], RESULT)], job_id="job", processed_bets=1)
+    cache_db.save_bet_results([(rows["a"], RESULT), (rows["b"], RESULT)], job_id="job", processed_bets=3)
+
+    results = cache_db.get_bet_results_since("job", 0, 10)
+    assert [(row["bet_id"], row["result_seq"]) for row in results] == [("c", 1), ("a", 2), ("b", 3)]
+    assert [row["bet_id"] for row in cache_db.get_bet_results_since("job", 1, 10)] == ["a", "b"]
+    assert cache_db.get_job_state("job")["result_seq"] == 3
+
+
+def test_add_bet_requests_drops_duplicate_bet_ids(cache_db):
+    cache_db.create_job("job", 4)
+
+    counts = cache_db.add_bet_requests("job", bet_rows("a", "b", "a", "c"))
+
+    assert counts == {"total": 3, "resolved": 0}
+    assert [row["bet_id"] for row in cache_db.get_bet_requests("job")] == ["a", "b", "c"]
+    assert cache_db.get_job_state("job")["total_bets"] == 3
+
+
+def store_result(cache_db, job_id: str, bet_id: str, fingerprint: str):
+    cache_db.create_job(job_id, 1)
+    cache_db.add_bet_requests(job_id, bet_rows(bet_id))
+    row_id = cache_db.get_bet_requests(job_id)[0]["id"]
+    key = result_key(bet_id, BET["market"], BET["bookmaker"], BET["event_date"])
+    cache_db.save_bet_results(
+        [(row_id, RESULT)], job_id=job_id, store=[(key, bet_id, RESULT)], source_fingerprint=fingerprint
+    )
+
+
+def test_stored_results_resolve_bets_of_later_jobs(cache_db):
+    cache_db.cache_league_data("football", "epl", BET["event_date"], LEAGUE_DATA)
+    store_result(cache_db, "first", "a", league_fingerprint("football", "epl", BET["event_date"], LEAGUE_DATA))
+
+    cache_db.create_job("second", 2)
+    counts = cache_db.add_bet_requests("second", bet_rows("a", "b"))
+
+    assert counts == {"total": 2, "resolved": 1}
+    resolved = cache_db.get_bet_results_since("second", 0, 10)
+    assert [(row["bet_id"], row["result_odds"], row["result_seq"]) for row in resolved] == [("a", 2.1, 1)]
+
+
+def test_stored_results_retire_when_their_league_is_rescraped(cache_db):
+    cache_db.cache_league_data("football", "epl", BET["event_date"], LEAGUE_DATA)
+    store_result(cache_db, "first", "a", league_fingerprint("football", "epl", BET["event_date"], LEAGUE_DATA))
+
+    corrected = {**LEAGUE_DATA, "scraped_at": "2025-12-03T00:00:00"}
+    cache_db.cache_league_data("football", "epl", BET["event_date"], corrected)
+    cache_db.create_job("second", 1)
+
+    assert cache_db.add_bet_requests("second", bet_rows("a")) == {"total": 1, "resolved": 0}
@@ -0,0 +1,127 @@
+"""Batch, job-status and stream endpoints, with league scraping stubbed (see conftest.py)."""
+
+from __future__ import annotations
+
+import json
+
+from conftest import BET, SERVER_MODULES, require_modules
+
+require_modules(*SERVER_MODULES)
+
+
+def bet(bet_id: str, **overrides) -> dict:
+    fields = {
+        "betId": bet_id,
+        "sport": BET["sport"],
+        "tournament": BET["tournament"],
+        "homeTeam": BET["home_team"],
+        "awayTeam": BET["away_team"],
+        "market": BET["market"],
+        "eventDate": BET["event_date"],
+        "bookmaker": BET["bookmaker"],
+    }
+    return {**fields, **overrides}
+
+
+def stream(client, job_id: str, **params) -> list[dict]:
+    with client.stream("GET", f"/api/job-status/{job_id}/stream", params=params) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_stream_resumes_after_since(client, server):
+    server.scrape_delay = 0.2
+    job_id = client.post(
+        "/api/batch-closing-odds?wait=0", json={"bets": [bet("1"), bet("2"), bet("3")]}
+    ).json()["job_id"]
+
+    first = stream(client, job_id)
+    resumed = stream(client, job_id, since=1)
+
+    assert [event["seq"] for event in first if event["event"] == "result"] == [1, 2, 3]
+    assert [event["seq"] for event in resumed if event["event"] == "result"] == [2, 3]
+    assert resumed[-1] == first[-1]
+    assert first[-1]["event"] == "end"
+    # Finished streams leave no watcher events behind
+    assert server.job_processor._job_watchers == {}
+
+
+def test_job_status_etag_covers_the_requested_window(client):
+    job_id = client.post(
+        "/api/batch-closing-odds?wait=5", json={"bets": [bet("1"), bet("2"), bet("3")]}
+    ).json()["job_id"]
+    url = f"/api/job-status/{job_id}"
+
+    page = client.get(url, params={"limit": 2})
+    assert [r["seq"] for r in page.json()["results"]] == [1, 2]
+    assert page.json()["next_cursor"] == "2"
+
+    etag = page.headers["etag"]
+    assert client.get(url, params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 304
+
+    rest = client.get(url, params={"cursor": "2", "limit": 2}, headers={"If-None-Match": etag})
+    assert rest.status_code == 200
+    assert [r["seq"] for r in rest.json()["results"]] == [3]
+    assert rest.json()["has_more"] is False
+
+    assert client.get(url, params={"cursor": "x"}).status_code == 400
+    assert client.get("/api/job-status/missing").status_code == 404
+
+
+def test_large_batch_is_stored_before_returning(client):
+    bets = [bet(str(i)) for i in range(24)] + [bet("0")]
+
+    body = client.post("/api/batch-closing-odds", json={"bets": bets}).json()
+
+    assert (body["total_bets"], body["status"]) == (24, "queued")
+    events = stream(client, body["job_id"])
+    assert events[-1]["event"] == "end"
+    assert events[-1]["progress"] == {"current": 24, "total": 24}
+    results = [event for event in events if event["event"] == "result"]
+    assert [event["seq"] for event in results] == list(range(1, 25))
+
+
+def test_stored_results_answer_repeat_bets_without_scraping(client, server):
+    client.post("/api/batch-closing-odds?wait=5", json={"bets": [bet("1")]})
+    scrapes = len(server.scrape_calls)
+
+    body = client.post("/api/batch-closing-odds?wait=0", json={"bets": [bet("1")]}).json()
+
+    assert body["status"] == "completed"
+    assert body["results"][0]["closing_odds"] == 2.1
+    assert len(server.scrape_calls) == scrapes
+
+
+def test_small_batch_returns_results(client, server):
+    response = client.post("/api/batch-closing-odds?wait=5", json={"bets": [bet("1"), bet("2")]})
+
+    body = response.json()
+    assert body["status"] == "completed"
+    assert [(r["bet_id"], r["closing_odds"]) for r in body["results"]] == [("1", 2.1), ("2", 2.1)]
+    assert len(server.scrape_calls) == 1
+
+
+def test_small_batch_that_cannot_be_stored_fails_its_job(client, server, monkeypatch):
+    async def locked(job_id, rows):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(server.async_db, "add_bet_requests", locked)
+
+    response = client.post("/api/batch-closing-odds?wait=5", json={"bets": [bet("1")]})
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Failed to store bets: database is locked"
+    [job] = server.db.get_jobs_by_status("failed")
+    status = client.get(f"/api/job-status/{job['id']}").json()
+    assert (status["status"], status["error"]) == ("failed", "database is locked")
+
+
+def test_fully_stored_small_batch_notifies_watchers(client, server, monkeypatch):
+    client.post("/api/batch-closing-odds?wait=5", json={"bets": [bet("1")]})
+    changes = []
+    monkeypatch.setattr(server.job_processor, "on_job_change", lambda: changes.append(1))
+
+    body = client.post("/api/batch-closing-odds?wait=0", json={"bets": [bet("1")]}).json()
+
+    assert body["status"] == "completed"
+    assert changes
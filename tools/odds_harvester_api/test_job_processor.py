@@ -0,0 +1,157 @@
+"""JobProcessor dispatch and recovery, with league scraping stubbed (see conftest.py)."""
+
+from __future__ import annotations
+
+import asyncio
+
+from conftest import LEAGUE_DATA, SERVER_MODULES, bet_rows, require_modules, run_processor
+
+require_modules(*SERVER_MODULES)
+
+
+def test_submitted_job_is_dispatched_without_polling(server, cache_db):
+    async def scenario(processor, async_db):
+        await processor.start()
+        await async_db.create_job("job", 2)
+        await async_db.add_bet_requests("job", bet_rows("a", "b"))
+        processor.submit("job")
+        assert await processor.wait_for_job("job", 5)
+        return await async_db.get_job_state("job")
+
+    state = run_processor(server, cache_db, scenario)
+
+    assert (state["status"], state["processed_bets"]) == ("completed", 2)
+    assert len(server.scrape_calls) == 1
+
+
+def test_recover_jobs_requeues_queued_and_interrupted_jobs(server, cache_db):
+    for job_id in ("queued", "interrupted", "done"):
+        cache_db.create_job(job_id, 1)
+        cache_db.add_bet_requests(job_id, bet_rows(f"{job_id}-bet"))
+    cache_db.update_job_status("interrupted", "processing")
+    cache_db.update_job_status("done", "completed")
+
+    async def scenario(processor, async_db):
+        await processor._recover_jobs()
+        recovered = set(processor._queued_ids)
+        statuses = {job_id: (await async_db.get_job_state(job_id))["status"] for job_id in recovered}
+
+        processor.running = True
+        processor._loop_task = asyncio.create_task(processor._process_loop())
+        finished = [await processor.wait_for_job(job_id, 5) for job_id in sorted(recovered)]
+        return recovered, statuses, finished
+
+    recovered, statuses, finished = run_processor(server, cache_db, scenario)
+
+    assert recovered == {"queued", "interrupted"}
+    assert statuses == {"queued": "queued", "interrupted": "queued"}
+    assert finished == [True, True]
+    assert cache_db.get_job_state("interrupted")["status"] == "completed"
+
+
+def test_failed_dispatch_returns_its_job_slot(server, cache_db):
+    for job_id in ("first", "second"):
+        cache_db.create_job(job_id, 1)
+        cache_db.add_bet_requests(job_id, bet_rows(f"{job_id}-bet"))
+
+    async def scenario(processor, async_db):
+        update_job_status = async_db.update_job_status
+
+        async def fail_first(job_id, status, *args):
+            if job_id == "first" and status == "processing":
+                raise RuntimeError("database is locked")
+            return await update_job_status(job_id, status, *args)
+
+        async_db.update_job_status = fail_first
+        await processor.start()
+        processor.submit("first")
+        processor.submit("second")
+        assert await processor.wait_for_job("second", 5)
+        await asyncio.gather(*processor._background_tasks)
+        return processor._job_slots._value, dict(processor._active_jobs)
+
+    free_slots, active = run_processor(server, cache_db, scenario)
+
+    assert free_slots == server.MAX_ACTIVE_JOBS
+    assert active == {}
+    assert cache_db.get_job_state("first")["status"] == "queued"
+
+
+def forget_access_times(database):
+    with database._transaction() as conn:
+        conn.execute("UPDATE league_cache_entries SET last_access = 0")
+
+
+def test_memory_cache_hits_refresh_last_access(server, cache_db):
+    async def scenario(processor, async_db):
+        await processor.start()
+        for job_id in ("first", "second"):
+            await async_db.create_job(job_id, 1)
+            await async_db.add_bet_requests(job_id, bet_rows(f"{job_id}-bet"))
+            processor.submit(job_id)
+            assert await processor.wait_for_job(job_id, 5)
+            await async_db.flush_access_times()
+            if job_id == "first":
+                await async_db.write(forget_access_times, cache_db)
+        await async_db.flush_access_times()
+        return processor.get_metrics()["league_memory_cache"]
+
+    memory_stats = run_processor(server, cache_db, scenario)
+
+    assert memory_stats["hits"] == 1
+    assert len(server.scrape_calls) == 1
+    last_access = cache_db._get_connection().execute("SELECT last_access FROM league_cache_entries").fetchone()[0]
+    assert last_access > 0
+
+
+def test_clear_caches_empties_every_in_process_cache(server, cache_db):
+    async def scenario(processor, async_db):
+        processor._league_cache.put(("league", "football", "epl", "2025-12-01"), dict(LEAGUE_DATA))
+        processor._season_cache[("football", "epl", 2025)] = server.SeasonIndex([])
+        processor._odds_api_cache[("soccer_epl", "eu", "h2h")] = (0.0, [])
+
+        processor.clear_caches()
+        return processor._league_cache.get_stats()["entries"], len(processor._season_cache), len(processor._odds_api_cache)
+
+    assert run_processor(server, cache_db, scenario) == (0, 0, 0)
+
+
+def test_scrape_errors_are_negative_cached_as_transient(server, cache_db, monkeypatch):
+    async def failing_scrape(self, sport, league, event_date, sources):
+        raise server.ScrapeFailed("browser crashed")
+
+    monkeypatch.setattr(server.JobProcessor, "_scrape_league", failing_scrape)
+
+    async def scenario(processor, async_db):
+        await processor.start()
+        await async_db.create_job("job", 1)
+        await async_db.add_bet_requests("job", bet_rows("a"))
+        processor.submit("job")
+        assert await processor.wait_for_job("job", 5)
+        return processor.get_metrics()["scrapes"]
+
+    scrapes = run_processor(server, cache_db, scenario)
+
+    [entry] = cache_db.get_negative_entries()
+    assert entry["reason"] == "transient_error"
+    assert entry["expires_at"] - entry["last_failed"] == server.NEGATIVE_CACHE_ERROR_TTL
+    assert scrapes["scrape_errors"] == 1
+    assert "empty" not in scrapes
+
+
+def test_only_closing_odds_results_are_stored(server, cache_db, monkeypatch):
+    async def odds_api_scrape(self, sport, league, event_date, sources):
+        return {**LEAGUE_DATA, "source": "the_odds_api"}
+
+    monkeypatch.setattr(server.JobProcessor, "_scrape_league", odds_api_scrape)
+
+    async def scenario(processor, async_db):
+        await processor.start()
+        await async_db.create_job("first", 1)
+        await async_db.add_bet_requests("first", bet_rows("a"))
+        processor.submit("first")
+        assert await processor.wait_for_job("first", 5)
+        await async_db.create_job("second", 1)
+        return await async_db.add_bet_requests("second", bet_rows("a"))
+
+    assert run_processor(server, cache_db, scenario) == {"total": 1, "resolved": 0}
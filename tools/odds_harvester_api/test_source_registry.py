@@ -0,0 +1,52 @@
+"""SourceRegistry resolution and its coverage metrics."""
+
+from __future__ import annotations
+
+from conftest import SERVER_MODULES, bet_rows, require_modules, run_processor
+
+require_modules(*SERVER_MODULES)
+
+
+def registry(server):
+    return server.SourceRegistry(server.SOURCE_MAPPINGS)
+
+
+def test_exact_alias_resolves_both_sources(server):
+    resolved = registry(server).resolve("Soccer", "English Premier League")
+
+    assert resolved["match"] == "exact"
+    assert resolved["odds_api"] == "soccer_epl"
+    assert resolved["oddsharvester"] == ("football", "england-premier-league")
+
+
+def test_slug_passthrough_is_reported_as_unmapped(server):
+    sources = registry(server)
+
+    resolved = sources.resolve("football", "Scotland Premiership")
+    stats = sources.get_stats()
+
+    assert resolved["oddsharvester"] == ("football", "scotland-premiership")
+    assert resolved["odds_api"] is None
+    assert (stats["slug"], stats["coverage"]) == (1, 0.0)
+    assert stats["top_unmapped"] == [{"sport": "football", "league": "Scotland Premiership", "count": 1}]
+
+
+def test_each_scraped_group_resolves_once(server, cache_db, monkeypatch):
+    async def empty_scrape(self, sport, league, event_date, sources):
+        return None
+
+    monkeypatch.setattr(server.JobProcessor, "_scrape_league", empty_scrape)
+    monkeypatch.setattr(server, "source_registry", registry(server))
+
+    async def scenario(processor, async_db):
+        await processor.start()
+        await async_db.create_job("job", 2)
+        await async_db.add_bet_requests("job", bet_rows("a", "b"))
+        processor.submit("job")
+        assert await processor.wait_for_job("job", 5)
+
+    run_processor(server, cache_db, scenario)
+
+    assert server.source_registry.get_stats()["lookups"] == 1
+    [entry] = cache_db.get_negative_entries()
+    assert entry["reason"] == "no_matches"